@@ -0,0 +1,223 @@
+"""
+Benchmarks for building and querying the case registry on synthetic archives
+scaled up from the real one.
+
+    python -m weather_cases.benchmark --scales 1,10 --output bench.json
+    python -m weather_cases.benchmark --scales 1,10 --baseline bench.json
+
+Each scale runs in a fresh process so that its peak RSS is its own.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from weather_cases.io import combine_cases, read_all_cases
+from weather_cases.registry import RegistryData, WeatherCaseRegistry
+
+DEFAULT_SCALES = (1, 10, 100, 1000)
+QUERIES = (
+    "el reno",
+    "moore ok",
+    "tornado",
+    "joplin ef5",
+    "may 2013",
+    "oklahoma",
+    "wedge tornado",
+    "lp supercell",
+    "2011",
+    "qwxz",
+)
+YEARS = (1974, 1999, 2011, 2013, 2024)
+REPEATS = 5
+
+
+def synthetic_archive(df: pd.DataFrame, scale: int, seed: int = 0) -> pd.DataFrame:
+    """
+    `scale` copies of the archive. Every copy after the first is shifted by a
+    whole number of days, so it gets new case ids, and has its locations
+    jittered by up to half a degree.
+    """
+    rng = np.random.default_rng(seed)
+    copies = [df]
+    for k in range(1, scale):
+        copy = df.copy()
+        for col in ("time_start", "time_end"):
+            copy[col] = _shift(copy[col], pd.to_timedelta(k, unit="D"))
+        for col in ("lat", "lon"):
+            jitter = rng.uniform(-0.5, 0.5, len(copy))
+            copy[col] = (copy[col].astype(float) + jitter).round(2)
+        copies.append(copy)
+    return combine_cases(copies)
+
+
+def run_scale(scale: int) -> dict:
+    df = synthetic_archive(read_all_cases(with_id=False), scale)
+    rss_before = _max_rss_mb()
+
+    start = time.perf_counter()
+    data = RegistryData.build(df)
+    build_s = time.perf_counter() - start
+    del df
+
+    # no search cache, so that every query is scored
+    registry = WeatherCaseRegistry(search_cache_size=0)
+    registry.data = data
+
+    return {
+        "scale": scale,
+        "cases": len(data.items),
+        "build_s": round(build_s, 3),
+        "rss_before_build_mb": rss_before,
+        "peak_rss_mb": _max_rss_mb(),
+        "latency_ms": {
+            "search": _latencies(registry.search, QUERIES),
+            "search_many": _latencies(registry.search_many, [list(QUERIES)]),
+            "get_by_year": _latencies(registry.get_by_year, YEARS),
+            "http_search": _http_latencies(data),
+        },
+    }
+
+
+def run(scales: list[int]) -> dict:
+    results = []
+    for scale in scales:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_scale, scale).result()
+        print(_summary(result))
+        results.append(result)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "queries": list(QUERIES),
+        "years": list(YEARS),
+        "repeats": REPEATS,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """One line per scale and metric with the change relative to the baseline."""
+    baseline_by_scale = {result["scale"]: result for result in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        base = baseline_by_scale.get(result["scale"])
+        if base is None:
+            continue
+
+        metrics = [("build_s", result["build_s"], base["build_s"])]
+        metrics.append(("peak_rss_mb", result["peak_rss_mb"], base["peak_rss_mb"]))
+        for name, latency in result["latency_ms"].items():
+            if name in base["latency_ms"]:
+                metrics.append(
+                    (f"{name}.p50", latency["p50"], base["latency_ms"][name]["p50"])
+                )
+        for name, value, base_value in metrics:
+            ratio = value / base_value if base_value else float("nan")
+            lines.append(
+                f"{result['scale']:>5}x {name:<20} {base_value:>10} -> {value:<10}"
+                f" ({ratio:.2f}x)"
+            )
+    return lines
+
+
+def _shift(times: pd.Series, delta: pd.Timedelta) -> pd.Series:
+    shifted = pd.to_datetime(times) + delta
+    if times.dtype != object:
+        return shifted
+    # missing times are None rather than NaT in the archive's object columns
+    return shifted.astype(object).where(shifted.notnull(), None)
+
+
+def _latencies(func, args) -> dict:
+    timings = []
+    for _ in range(REPEATS):
+        for arg in args:
+            start = time.perf_counter()
+            func(arg)
+            timings.append((time.perf_counter() - start) * 1000)
+    return _percentiles(timings)
+
+
+def _http_latencies(data: RegistryData) -> dict:
+    from fastapi.testclient import TestClient
+
+    from weather_cases.lifespan import REGISTRY
+    from weather_cases.main import app
+
+    # without entering the client the app's lifespan (and archive load) never runs
+    client = TestClient(app)
+    timings = []
+    for _ in range(REPEATS):
+        # re-assigning clears the search cache, so every round is scored
+        REGISTRY.data = data
+        for q in QUERIES:
+            start = time.perf_counter()
+            client.get("/cases/search", params={"q": q})
+            timings.append((time.perf_counter() - start) * 1000)
+    return _percentiles(timings)
+
+
+def _percentiles(timings: list[float]) -> dict:
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p90": round(float(p90), 3),
+        "p99": round(float(p99), 3),
+        "max": round(max(timings), 3),
+    }
+
+
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1024**2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summary(result: dict) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"{result['scale']:>5}x {result['cases']:>8} cases"
+        f"  build {result['build_s']:.2f}s"
+        f"  peak {result['peak_rss_mb']:.0f} MB"
+        f"  search p50 {latency['search']['p50']:.2f} ms"
+        f" p99 {latency['search']['p99']:.2f} ms"
+    )
+
+
+def entrypoint() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        default=",".join(str(scale) for scale in DEFAULT_SCALES),
+        help="comma-separated archive size multipliers",
+    )
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    args = parser.parse_args()
+
+    results = run([int(scale) for scale in args.scales.split(",")])
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote benchmark results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("\n".join(compare(results, baseline)))
+
+
+if __name__ == "__main__":
+    entrypoint()
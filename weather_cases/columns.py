@@ -0,0 +1,83 @@
+from collections.abc import Iterable
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+class CaseColumns:
+    """
+    Column-per-field storage of the case archive.
+
+    Every archive column is kept as one NumPy array (datetime64 for
+    timestamps, object arrays of interned strings otherwise) alongside the
+    pre-serialized case JSON and search string of each row.
+    """
+
+    def __init__(self, df: pd.DataFrame, json: list[bytes], search_strings: list[str]):
+        self.index = df.index.to_numpy()
+        self.names = list(df.columns)
+        self.columns = {name: _to_column(df[name]) for name in self.names}
+        self.json = Fragments(json)
+        self.search_strings = _object_array(search_strings)
+
+    def __len__(self):
+        return len(self.index)
+
+    def value(self, name: str, pos: int):
+        value = self.columns[name][pos]
+        if isinstance(value, np.datetime64):
+            return pd.Timestamp(value)
+        return value
+
+    def row_values(self, pos: int) -> tuple:
+        return tuple(self.value(name, pos) for name in self.names)
+
+    def row(self, pos: int) -> pd.Series:
+        return pd.Series(
+            dict(zip(self.names, self.row_values(pos))),
+            name=self.index[pos],
+            dtype=object,
+        )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {name: self.columns[name] for name in self.names},
+            index=self.index,
+            columns=self.names,
+        )
+
+
+class Fragments:
+    """
+    Byte strings packed into one contiguous buffer, sliced by an offsets
+    array. Being plain NumPy arrays, both can be memory-mapped from a
+    snapshot and shared between processes.
+    """
+
+    def __init__(self, fragments: Iterable[bytes]):
+        fragments = list(fragments)
+        self._offsets = np.cumsum([0] + [len(f) for f in fragments], dtype=np.int64)
+        self._buffer = np.frombuffer(b"".join(fragments), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, pos: int) -> bytes:
+        return self._buffer[self._offsets[pos] : self._offsets[pos + 1]].tobytes()
+
+    def __iter__(self):
+        return (self[pos] for pos in range(len(self)))
+
+
+def _to_column(series: pd.Series) -> np.ndarray:
+    values = series.to_numpy()
+    if values.dtype != object:
+        return values
+    return _object_array([sys.intern(v) if isinstance(v, str) else v for v in values])
+
+
+def _object_array(values: list) -> np.ndarray:
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
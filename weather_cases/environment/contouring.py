@@ -0,0 +1,79 @@
+"""
+Contour lines and filled contours of a DataArray, traced by contourpy's
+marching squares directly instead of through pyplot. No figure or axes are
+involved, so nothing accumulates between calls and calls from different
+threads don't share any state.
+
+The generator is set up the way matplotlib sets it up for `contour` and
+`contourf`, so the geometry is the same as theirs.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from contourpy import FillType, LineType, contour_generator
+import numpy as np
+import xarray as xr
+
+# vertex codes, the same as matplotlib's Path codes
+MOVETO = 1
+LINETO = 2
+CLOSEPOLY = 79
+
+
+@dataclass(frozen=True)
+class ContourPath:
+    """
+    All the lines at one level, or all the polygons of one filled band
+    (labelled with its lower bound), as (lon, lat) vertices and their codes.
+    """
+
+    level: float
+    vertices: np.ndarray
+    codes: np.ndarray
+
+
+def contour_lines(da: xr.DataArray, levels: Iterable[float]) -> list[ContourPath]:
+    generator = _generator(da, _values(da))
+    return [
+        _joined(level, *generator.lines(level)) for level in np.asarray(levels, float)
+    ]
+
+
+def contour_fills(da: xr.DataArray, levels: Iterable[float]) -> list[ContourPath]:
+    levels = np.asarray(levels, float)
+    if len(levels) < 2:
+        return []
+
+    z = _values(da)
+    generator = _generator(da, z)
+    lowers, uppers = levels[:-1].copy(), levels[1:]
+    if z.min() == lowers[0]:
+        # like matplotlib, include the minimum in the lowest band
+        lowers[0] -= 1
+    return [
+        _joined(level, *generator.filled(lower, upper))
+        for level, lower, upper in zip(levels, lowers, uppers)
+    ]
+
+
+def _values(da: xr.DataArray) -> np.ma.MaskedArray:
+    return np.ma.masked_invalid(da.transpose("latitude", "longitude").values)
+
+
+def _generator(da: xr.DataArray, z: np.ma.MaskedArray):
+    return contour_generator(
+        x=da.longitude.values,
+        y=da.latitude.values,
+        z=z,
+        name="mpl2014",
+        corner_mask=True,
+        line_type=LineType.SeparateCode,
+        fill_type=FillType.OuterCode,
+    )
+
+
+def _joined(level: float, vertices: list, codes: list) -> ContourPath:
+    if not vertices:
+        return ContourPath(float(level), np.empty((0, 2)), np.empty(0, np.uint8))
+    return ContourPath(float(level), np.concatenate(vertices), np.concatenate(codes))
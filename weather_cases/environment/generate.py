@@ -1,10 +1,9 @@
 from typing import Iterable
-import matplotlib.pyplot as plt
-import numpy as np
 import xarray as xr
 from geojson import GeoJSON
 
 from weather_cases.environment.configs import CONFIGS, EventDataRequest
+from weather_cases.environment.contouring import contour_lines
 from weather_cases.environment.contours import get_contours
 from weather_cases.environment.era5_rda import (
     CODES_PL,
@@ -34,10 +33,8 @@ def height_contours(
             da = ds.sel(level=req.level, time=req.timestamp).Z / 9.8065
             da = _process_ds(da)
 
-            x, y = np.meshgrid(da.longitude, da.latitude)
             contour_levels = get_contours(CONFIGS[req.level].height, da)  # type: ignore
-            CS = plt.contour(x, y, da, levels=contour_levels)
-            yield req, contour_linestrings(CS)
+            yield req, contour_linestrings(contour_lines(da, contour_levels))
 
 
 def wind_data(
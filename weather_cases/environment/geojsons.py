@@ -1,29 +1,26 @@
 from itertools import product
-from matplotlib.contour import ContourSet
-from matplotlib.path import Path
 from geojson import GeoJSON
 
 import numpy as np
 import xarray as xr
 
+from weather_cases.environment.contouring import (
+    CLOSEPOLY,
+    LINETO,
+    MOVETO,
+    ContourPath,
+)
 
-def contour_linestrings(CS: ContourSet, digits: int = 2) -> GeoJSON:
+
+def contour_linestrings(paths: list[ContourPath], digits: int = 2) -> GeoJSON:
     geojson_dict = {
         "type": "FeatureCollection",
     }
     features = []
 
-    for level, path in zip(CS.levels, CS.get_paths()):
-        segments = []
-        for vertex, code in path.iter_segments():
-            x, y = vertex
-            next_coord = [round(float(x), digits), round(float(y), digits)]
-            if code == Path.MOVETO:
-                segments.append([next_coord])
-            elif code == Path.LINETO and segments:
-                segments[-1].append(next_coord)
-            elif code == Path.CLOSEPOLY and segments:
-                segments[-1].append(segments[-1][0])
+    for path in paths:
+        level = path.level
+        segments = _segments(path, digits)
 
         path_feats = [
             {
@@ -41,23 +38,15 @@ def contour_linestrings(CS: ContourSet, digits: int = 2) -> GeoJSON:
     return GeoJSON(geojson_dict)
 
 
-def contour_polygons(CS: ContourSet, digits: int = 2) -> GeoJSON:
+def contour_polygons(paths: list[ContourPath], digits: int = 2) -> GeoJSON:
     geojson_dict = {
         "type": "FeatureCollection",
     }
     features = []
 
-    for level, path in zip(CS.levels, CS.get_paths()):
-        segments = []
-        for vertex, code in path.iter_segments():
-            x, y = vertex
-            next_coord = [round(float(x), digits), round(float(y), digits)]
-            if code == Path.MOVETO:
-                segments.append([next_coord])
-            elif code == Path.LINETO and segments:
-                segments[-1].append(next_coord)
-            elif code == Path.CLOSEPOLY and segments:
-                segments[-1].append(segments[-1][0])
+    for path in paths:
+        level = path.level
+        segments = _segments(path, digits)
 
         path_feats = [
             {
@@ -75,6 +64,29 @@ def contour_polygons(CS: ContourSet, digits: int = 2) -> GeoJSON:
     return GeoJSON(geojson_dict)
 
 
+def _segments(path: ContourPath, digits: int) -> list[list[list[float]]]:
+    """
+    The coordinates of each line or ring of `path`. Those with a non-finite
+    vertex are dropped, since NaN is not valid in JSON.
+    """
+    segments = []
+    finite = []
+    vertices_finite = np.isfinite(path.vertices).all(axis=1).tolist()
+    for (x, y), code, is_finite in zip(
+        path.vertices.tolist(), path.codes.tolist(), vertices_finite
+    ):
+        next_coord = [round(x, digits), round(y, digits)]
+        if code == MOVETO:
+            segments.append([next_coord])
+            finite.append(is_finite)
+        elif code == LINETO and segments:
+            segments[-1].append(next_coord)
+            finite[-1] = finite[-1] and is_finite
+        elif code == CLOSEPOLY and segments:
+            segments[-1].append(segments[-1][0])
+    return [segment for segment, ok in zip(segments, finite) if ok]
+
+
 def wind_vector_grid(u: xr.DataArray, v: xr.DataArray, digits: int = 2) -> GeoJSON:
     if u.shape != v.shape:
         raise ValueError("u and v are not the same shape")
@@ -100,6 +112,9 @@ def wind_vector_grid(u: xr.DataArray, v: xr.DataArray, digits: int = 2) -> GeoJS
             wdir = dir.sel(latitude=lat, longitude=lon).item() * 180 / np.pi  # type: ignore
         except KeyError:
             continue
+        if not (np.isfinite(wspd) and np.isfinite(wdir)):
+            # missing data; NaN is not valid in JSON
+            continue
 
         features.append(
             {
@@ -2,14 +2,16 @@ import gzip
 from io import BytesIO
 import json
 import os
+from typing import Any
 from aiohttp import ClientSession
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from geojson import GeoJSON
+import xarray as xr
 
 from weather_cases.environment.configs import CONFIGS, EventDataRequest
+from weather_cases.environment.contouring import contour_fills
 from weather_cases.environment.contours import get_contours
 from weather_cases.environment.geojsons import (
     contour_polygons,
@@ -17,35 +19,116 @@ from weather_cases.environment.geojsons import (
 )
 from weather_cases.environment.s3 import read_dataset
 from weather_cases.environment.types import DateTimeLike, Level
-from weather_cases.utils.timer import Timer
+from weather_cases.utils.cache import LRUCache
+from weather_cases.utils.metrics import (
+    METRICS,
+    CDN_FETCHES,
+    S3_READS,
+    CallbackMetric,
+    span,
+)
+from weather_cases.utils.pool import WorkerPool
 
 load_dotenv()
 
 
+def _plots_size(plots: tuple[bytes, bytes]) -> int:
+    return sum(len(plot) for plot in plots)
+
+
+# wind data for an event, time and level never changes, so finished plots are
+# kept until evicted by size
+WIND_PLOTS_CACHE = LRUCache(
+    maxsize=4096,
+    maxbytes=int(os.getenv("WIND_PLOTS_CACHE_BYTES", 256 * 1024**2)),
+    sizeof=_plots_size,
+)
+
+METRICS.register(
+    CallbackMetric(
+        "wind_plots_cache_hits_total",
+        "Wind plots served from the wind plots cache.",
+        "counter",
+        lambda: WIND_PLOTS_CACHE.hits,
+    )
+)
+METRICS.register(
+    CallbackMetric(
+        "wind_plots_cache_misses_total",
+        "Wind plots that had to be rendered.",
+        "counter",
+        lambda: WIND_PLOTS_CACHE.misses,
+    )
+)
+METRICS.register(
+    CallbackMetric(
+        "wind_plots_cache_bytes",
+        "Serialized size of the wind plots in the cache.",
+        "gauge",
+        lambda: WIND_PLOTS_CACHE.bytes,
+    )
+)
+
+
+def _warm_up() -> None:
+    # runs once in every render worker, where unpickling it has already
+    # imported this module and with it xarray, s3fs and contourpy; zarr is
+    # only imported on the first read otherwise
+    import zarr  # noqa: F401
+
+
+RENDER_POOL = WorkerPool(
+    workers=int(os.getenv("ENVIRONMENT_RENDER_WORKERS", 2)),
+    max_pending=int(os.getenv("ENVIRONMENT_RENDER_QUEUE", 8)),
+    initializer=_warm_up,
+)
+
+
 async def wind_plots(
     event_id: str, dt: DateTimeLike, pressure_level: Level
-) -> tuple[GeoJSON | None, GeoJSON | None]:
+) -> tuple[bytes | None, bytes | None]:
+    """
+    Isotach polygons and wind barbs for the request as compact GeoJSON bytes,
+    rendered in RENDER_POOL so the event loop stays free meanwhile. The S3 read
+    is counted here, since metrics recorded in the workers never reach /metrics.
+    """
     data_request = EventDataRequest(event_id, pd.Timestamp(dt), pressure_level)
-    with Timer(identifier="read dataset"):
-        ds = read_dataset(data_request, "wind")
+    cached = WIND_PLOTS_CACHE.get(data_request)
+    if cached is not None:
+        return cached
 
-    if ds is None:
+    with span("render wind plots"):
+        outcome, plots = await RENDER_POOL.run(render_wind_plots, data_request)
+    S3_READS.inc(kind="wind", outcome=outcome)
+    if plots is None:
         return None, None
+    WIND_PLOTS_CACHE.put(data_request, plots)
+    return plots
+
 
-    # eager load to avoid network round-trips, we will be using all coordinates
-    with Timer(identifier="load"):
-        # ds.load()
-        u, v = ds.U, ds.V
+def render_wind_plots(
+    data_request: EventDataRequest,
+) -> tuple[str, tuple[bytes, bytes] | None]:
+    """The outcome of reading the wind dataset, and the plots if it was found."""
+    ds = read_dataset(data_request, "wind")
+    if ds is None:
+        return "not_found", None
+    isotachs, barbs = wind_geojsons(ds)
+    return "ok", (to_json_bytes(isotachs), to_json_bytes(barbs))
 
+
+def wind_geojsons(ds: xr.Dataset) -> tuple[GeoJSON, GeoJSON]:
+    u, v = ds.U, ds.V
     pressure_level = ds.level.item()
 
-    with Timer(identifier="generate contours and vectors"):
-        x, y = np.meshgrid(u.longitude, u.latitude)
-        wspd = np.sqrt(u**2 + v**2)
+    wspd = np.sqrt(u**2 + v**2)
+    isotach_levels = get_contours(CONFIGS[pressure_level].isotachs, wspd)
+    isotachs = contour_polygons(contour_fills(wspd, isotach_levels))
+    return isotachs, wind_vector_grid(u, v)
+
 
-        isotach_levels = get_contours(CONFIGS[pressure_level].isotachs, wspd)
-        CS = plt.contourf(x, y, wspd, levels=isotach_levels)
-        return contour_polygons(CS), wind_vector_grid(u, v)
+def to_json_bytes(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
 
 
 async def height_contours(
@@ -58,10 +141,12 @@ async def height_contours(
     data_request = EventDataRequest(event_id, pd.Timestamp(dt), pressure_level)
     data_path = data_request.to_s3_location("heights", "geojson.gz")
 
-    with Timer(identifier="get height GeoJSON"):
+    with span("get height GeoJSON"):
         async with client.get(f"{cdn_url}/{data_path}") as resp:
             if not resp.ok:
+                CDN_FETCHES.inc(outcome=str(resp.status))
                 return None
+            CDN_FETCHES.inc(outcome="ok")
 
             gzipped_data = await resp.read()
             with gzip.GzipFile(fileobj=BytesIO(gzipped_data)) as gz:
@@ -2,14 +2,15 @@ from typing import Dict
 import aiohttp
 import asyncio
 from datetime import datetime
-from geojson import GeoJSON
-from fastapi import APIRouter, HTTPException
+import json
+from fastapi import APIRouter, HTTPException, Response
 
 from weather_cases.environment import retrieve
 from weather_cases.environment.configs import CONFIGS
 from weather_cases.environment.models import EnvironmentData, EnvironmentDataOverview
 from weather_cases.environment.overview import event_available_data
 from weather_cases.environment.types import Level, OutputVar
+from weather_cases.utils.cache import CacheInfo
 
 
 router = APIRouter(prefix="/environment", tags=["environment"])
@@ -25,29 +26,46 @@ def retrieve_environment_overview(event_id: str) -> list[EnvironmentDataOverview
     return event_available_data(event_id)
 
 
-@router.get("/data/{event_id}/{timestamp}/{level}")
+@router.get("/cache")
+def wind_plots_cache_info() -> CacheInfo:
+    return retrieve.WIND_PLOTS_CACHE.info()
+
+
+@router.get("/data/{event_id}/{timestamp}/{level}", response_model=EnvironmentData)
 async def retrieve_environment(
     event_id: str,
     timestamp: datetime,
     level: Level,
-) -> EnvironmentData:
+) -> Response:
     _check_level(level)
 
     async with aiohttp.ClientSession() as http_client:
-        results = await asyncio.gather(
+        # the wind plots render in another process while the heights download
+        heights, (isotachs, wind_vectors) = await asyncio.gather(
             retrieve.height_contours(event_id, timestamp, level, http_client),
             retrieve.wind_plots(event_id, timestamp, level),
         )
-        heights = results[0]
-        wind = results[1]
-        isotachs, wind_vectors = wind
-
-        data: Dict[OutputVar, GeoJSON | None] = {
-            "height": heights,
-            "isotachs": isotachs,
-            "barbs": wind_vectors,
-        }
-
-        return EnvironmentData(
-            event_id=event_id, timestamp=timestamp, level=level, data=data
-        )
+
+    data: Dict[OutputVar, bytes | None] = {
+        "height": retrieve.to_json_bytes(heights) if heights is not None else None,
+        "isotachs": isotachs,
+        "barbs": wind_vectors,
+    }
+    return Response(
+        content=_environment_json(event_id, timestamp, level, data),
+        media_type="application/json",
+    )
+
+
+def _environment_json(
+    event_id: str, timestamp: datetime, level: Level, data: dict[str, bytes | None]
+) -> bytes:
+    # EnvironmentData with the already serialized GeoJSON spliced in as its data
+    head = EnvironmentData(
+        event_id=event_id, timestamp=timestamp, level=level, data={}
+    ).model_dump_json(exclude={"data"})
+    fields = b",".join(
+        json.dumps(name).encode() + b":" + (value if value is not None else b"null")
+        for name, value in data.items()
+    )
+    return head.encode()[:-1] + b',"data":{' + fields + b"}}"
@@ -58,12 +58,14 @@ def save_dataset(
 
 
 def read_dataset(data_request: EventDataRequest, kind: str) -> xr.Dataset | None:
+    # may run in a render worker process, so reads are counted by the caller
     try:
         s3_path = data_request.full_s3_location_path(kind, "zarr")
         store = s3fs.S3Map(root=s3_path, s3=S3_FILE_SYSTEM, check=False)
-        return xr.open_zarr(store, chunks=None)  # type: ignore
+        ds = xr.open_zarr(store, chunks=None)  # type: ignore
     except FileNotFoundError:
         return None
+    return ds
 
 
 def _write_s3_obj(key: str, data: bytes) -> None:
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 import xarray as xr
 
@@ -13,3 +14,17 @@ def sample_height_ds():
             )
         }
     )
+
+
+@pytest.fixture
+def sample_wind_ds():
+    lats, lons = np.arange(30, 40.5, 0.5), np.arange(-100, -89.5, 0.5)
+    lon_grid, lat_grid = np.meshgrid(lons, lats)
+    u = 40 * np.exp(-((lat_grid - 35) ** 2 + (lon_grid + 95) ** 2) / 10)
+    return xr.Dataset(
+        data_vars={
+            "U": xr.DataArray(u, dims=("latitude", "longitude")),
+            "V": xr.DataArray(u / 2, dims=("latitude", "longitude")),
+        },
+        coords={"latitude": lats, "longitude": lons, "level": 500},
+    )
@@ -0,0 +1,33 @@
+from matplotlib.figure import Figure
+import numpy as np
+import pytest
+
+from weather_cases.environment.contouring import contour_fills, contour_lines
+
+
+@pytest.mark.parametrize("filled", [False, True])
+def test_same_geometry_as_matplotlib(sample_wind_ds, filled):
+    wspd = np.sqrt(sample_wind_ds.U**2 + sample_wind_ds.V**2)
+    levels = np.arange(0, 50, 4)
+
+    ax = Figure().add_subplot()
+    x, y = np.meshgrid(wspd.longitude, wspd.latitude)
+    if filled:
+        expected = ax.contourf(x, y, wspd, levels=levels)
+        paths = contour_fills(wspd, levels)
+    else:
+        expected = ax.contour(x, y, wspd, levels=levels)
+        paths = contour_lines(wspd, levels)
+
+    assert len(paths) == len(expected.get_paths())
+    for path, level, mpl_path in zip(paths, expected.levels, expected.get_paths()):
+        assert path.level == level
+        np.testing.assert_array_equal(path.vertices, mpl_path.vertices)
+        if len(path.codes):
+            np.testing.assert_array_equal(path.codes, mpl_path.codes)
+
+
+def test_levels_outside_data(sample_height_ds):
+    paths = contour_lines(sample_height_ds.Z, [100, 200])
+    assert [len(path.vertices) for path in paths] == [0, 0]
+    assert contour_fills(sample_height_ds.Z, [100]) == []
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+
+import numpy as np
+import pytest
+
+from weather_cases.environment import retrieve
+from weather_cases.environment.contouring import (
+    CLOSEPOLY,
+    LINETO,
+    MOVETO,
+    ContourPath,
+)
+from weather_cases.environment.geojsons import contour_polygons
+from weather_cases.exceptions import QueueFullException
+from weather_cases.utils.cache import LRUCache
+from weather_cases.utils.metrics import Counter
+from weather_cases.utils.pool import WorkerPool
+
+
+def test_wind_geojsons(sample_wind_ds):
+    isotachs, barbs = retrieve.wind_geojsons(sample_wind_ds)
+    levels = {f["properties"]["level"] for f in isotachs["features"]}
+    assert levels and min(levels) >= 20
+    # one barb per whole degree
+    assert len(barbs["features"]) == 11 * 11
+
+
+def test_wind_geojsons_skip_missing_data(sample_wind_ds):
+    sample_wind_ds.U[10, 10] = np.nan
+    sample_wind_ds.V[2, 4:7] = np.nan
+    isotachs, barbs = retrieve.wind_geojsons(sample_wind_ds)
+    assert isotachs["features"]
+    # at (35, -95), (31, -98) and (31, -97)
+    assert len(barbs["features"]) == 11 * 11 - 3
+    for plot in (isotachs, barbs):
+        json.dumps(plot, allow_nan=False)
+
+
+def test_contour_polygons_drop_non_finite_rings():
+    vertices = np.array(
+        [[0, 0], [1, 0], [1, 1], [0, 0], [2, 2], [np.nan, 2], [3, 3], [2, 2]]
+    )
+    codes = np.array([MOVETO, LINETO, LINETO, CLOSEPOLY] * 2, dtype=np.uint8)
+    polygons = contour_polygons([ContourPath(20.0, vertices, codes)])
+    assert [f["geometry"]["coordinates"] for f in polygons["features"]] == [
+        [[[0, 0], [1, 0], [1, 1], [0, 0]]]
+    ]
+
+
+def test_wind_plots_are_cached(monkeypatch):
+    renders = []
+
+    def render(data_request):
+        renders.append(data_request)
+        return "ok", (b"{}", b"{}")
+
+    monkeypatch.setattr(retrieve, "render_wind_plots", render)
+    monkeypatch.setattr(
+        retrieve, "WIND_PLOTS_CACHE", LRUCache(maxbytes=1024, sizeof=len)
+    )
+
+    for level in (500, 700, 500):
+        asyncio.run(retrieve.wind_plots("event", "2013-05-20 20:00", level))
+    assert [request.level for request in renders] == [500, 700]
+
+
+def test_wind_plots_count_reads_in_parent(monkeypatch):
+    monkeypatch.setattr(
+        retrieve, "render_wind_plots", lambda data_request: ("not_found", None)
+    )
+    monkeypatch.setattr(retrieve, "S3_READS", Counter("reads", "", ("kind", "outcome")))
+
+    plots = asyncio.run(retrieve.wind_plots("event", "2013-05-20 20:00", 500))
+    assert plots == (None, None)
+    assert retrieve.S3_READS.value(kind="wind", outcome="not_found") == 1
+
+
+def test_worker_pool_runs_in_processes():
+    pool = WorkerPool(workers=1, max_pending=2)
+
+    async def render():
+        await pool.start()
+        try:
+            return await pool.run(retrieve.to_json_bytes, {"type": "Point"})
+        finally:
+            pool.shutdown()
+
+    assert json.loads(asyncio.run(render())) == {"type": "Point"}
+
+
+def _exit_once(flag: str) -> str:
+    # kills the worker process the first time, like an out-of-memory kill
+    if not os.path.exists(flag):
+        open(flag, "w").close()
+        os._exit(1)
+    return "rendered"
+
+
+def test_worker_pool_replaces_dead_workers(tmp_path):
+    pool = WorkerPool(workers=1, max_pending=2)
+
+    async def render():
+        await pool.start()
+        try:
+            first = await pool.run(_exit_once, str(tmp_path / "died"))
+            return first, await pool.run(retrieve.to_json_bytes, {})
+        finally:
+            pool.shutdown()
+
+    assert asyncio.run(render()) == ("rendered", b"{}")
+
+
+def test_worker_pool_bounds_pending_jobs():
+    pool = WorkerPool(workers=0, max_pending=1)
+
+    async def render_twice():
+        return await asyncio.gather(
+            pool.run(retrieve.to_json_bytes, {}), pool.run(retrieve.to_json_bytes, {})
+        )
+
+    with pytest.raises(QueueFullException):
+        asyncio.run(render_twice())
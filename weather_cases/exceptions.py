@@ -2,3 +2,15 @@ class DataNotFoundException(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
+
+
+class QueueFullException(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class WorkerUnavailableException(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
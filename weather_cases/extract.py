@@ -1,9 +1,18 @@
 import hashlib
 import re
+import numpy as np
 import pandas as pd
+from thefuzz.utils import full_process
 
 from weather_cases.models import WeatherCase
-from weather_cases.geog import get_state
+from weather_cases.geog import can_provinces, get_state, us_states
+
+LIST_COLUMNS = ["tags", "features", "records", "notes", "user_comments", "photo_video"]
+LOCATION_SEPARATOR = re.compile(r"[–\-&/]+")
+STATE_ABBREV = re.compile(r"\b([A-Z]{2})\b")
+# same precedence as get_state
+STATES = {**can_provinces, **us_states}
+LOCAL_TZ = "America/Chicago"
 
 
 def to_hash(row: pd.Series) -> str:
@@ -13,38 +22,74 @@ def to_hash(row: pd.Series) -> str:
 
 def to_weather_case(row: pd.Series) -> WeatherCase:
     row_dict = row.to_dict()
-    comma_sep_attrs = dict(
-        tags=_to_list(row, "tags"),
-        features=_to_list(row, "features"),
-        records=_to_list(row, "records"),
-        notes=_to_list(row, "notes"),
-        user_comments=_to_list(row, "user_comments"),
-        photo_video=_to_list(row, "photo_video"),
-    )
-    row_dict.update(comma_sep_attrs)
+    row_dict.update({col: _to_list(row, col) for col in LIST_COLUMNS})
+    return make_weather_case(row_dict, to_hash(row))
+
 
+def make_weather_case(values: dict, case_id: str) -> WeatherCase:
+    """A case from archive values with the `LIST_COLUMNS` already split."""
     return WeatherCase(
-        **row_dict,
-        id=to_hash(row),
+        **values,
+        id=case_id,
     )
 
 
 def to_searchable(row: pd.Series) -> dict:
-    ret = {}
-    ret.update(**location_attrs(row))
-    ret.update(**date_attrs(row))
-    ret.update(**misc_attrs(row))
-    return ret
+    return make_searchable(
+        **location_attrs(row), **date_attrs(row), **misc_attrs(row)
+    )
+
+
+def make_searchable(
+    locations: list[str],
+    states: list[str],
+    date_reprs: list[str],
+    tags: list[str],
+    outbreak: str | None,
+) -> dict:
+    return dict(
+        locations=locations,
+        states=states,
+        date_reprs=date_reprs,
+        tags=tags,
+        outbreak=outbreak,
+    )
+
+
+def to_search_string(searchable: dict) -> str:
+    # the same normalization thefuzz applies to the query and choices before WRatio
+    return normalize_query(str(searchable))
+
+
+def normalize_query(q: str) -> str:
+    return full_process(q, force_ascii=True)
+
+
+def suggestion_terms(row: pd.Series) -> set[str]:
+    loc_attrs = location_attrs(row)
+    return make_suggestion_terms(
+        loc_attrs["locations"], loc_attrs["states"], row["nickname"], row["outbreak"]
+    )
+
+
+def make_suggestion_terms(
+    locations: list[str],
+    states: list[str],
+    nickname: str | None,
+    outbreak: str | None,
+) -> set[str]:
+    terms = locations + states + [nickname, outbreak]
+    return {term.strip() for term in terms if term and term.strip()}
 
 
 def location_attrs(row: pd.Series) -> dict:
     loc_cell = row["event_name"]
-    loc_attrs = re.split(r"[–\-&/]+", loc_cell)
+    loc_attrs = LOCATION_SEPARATOR.split(loc_cell)
     loc_attrs.append(loc_cell)
 
     states = []
     for attr in loc_attrs:
-        state_match = re.search(r"\b[A-Z]{2}\b", attr)
+        state_match = STATE_ABBREV.search(attr)
         if state_match:
             state_abbr = state_match.group(0)
             state = get_state(state_abbr)
@@ -57,7 +102,7 @@ def location_attrs(row: pd.Series) -> dict:
 def date_attrs(row: pd.Series) -> dict:
     # TODO: convert to local time zone at lat lon - might need an API to do that
     dt = row["time_start"]
-    ts_ctrl = pd.Timestamp(dt, tz="utc").tz_convert("America/Chicago")
+    ts_ctrl = pd.Timestamp(dt, tz="utc").tz_convert(LOCAL_TZ)
     return {
         "date_reprs": [
             dt.isoformat(),
@@ -86,3 +131,84 @@ def _to_list(row: pd.Series, col: str) -> list[str]:
     if not elem:
         return []
     return [s.strip() for s in elem.split(",")]
+
+
+def to_hashes(df: pd.DataFrame) -> list[str]:
+    """`to_hash` of every row of `df`."""
+    days = pd.to_datetime(df["time_start"]).to_numpy().astype("datetime64[D]")
+    summaries = (df["event_name"] + "_" + days.astype(str)).tolist()
+    return [hashlib.md5(summary.encode()).hexdigest() for summary in summaries]
+
+
+def derive_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The attributes `to_hash`, `location_attrs`, `date_attrs` and `_to_list`
+    extract from a row, for every row of `df` at once: id, locations, states,
+    date_reprs and the split `LIST_COLUMNS`, indexed like `df`.
+
+    Values repeat a lot across rows (event names, tag lists, days), so each
+    attribute is extracted once per distinct value. Rows with equal values
+    share the same lists, which must therefore not be modified.
+    """
+    if df.empty:
+        columns = ["id", "locations", "states", "date_reprs", *LIST_COLUMNS]
+        return pd.DataFrame(columns=columns, index=df.index)
+
+    names, unique_names = pd.factorize(df["event_name"])
+    locations = [
+        parts + [name]
+        for parts, name in zip(
+            pd.Series(unique_names).str.split(LOCATION_SEPARATOR).tolist(),
+            unique_names.tolist(),
+        )
+    ]
+
+    derived = {
+        "id": to_hashes(df),
+        "locations": _take(locations, names),
+        "states": _take(_states(locations), names),
+        "date_reprs": _date_reprs(pd.to_datetime(df["time_start"])),
+    }
+    for col in LIST_COLUMNS:
+        # missing values get code -1, and split to an empty list like ""
+        codes, uniques = pd.factorize(df[col])
+        lists = [
+            [s.strip() for s in elem.split(",")] if elem else [] for elem in uniques
+        ]
+        derived[col] = _take(lists + [[]], codes)
+    return pd.DataFrame(derived, index=df.index)
+
+
+def _take(values: list, codes: np.ndarray) -> list:
+    return [values[code] for code in codes.tolist()]
+
+
+def _states(locations: list[list[str]]) -> list[list[str]]:
+    exploded = pd.Series(locations, dtype=object).explode()
+    abbrevs = exploded.str.extract(STATE_ABBREV, expand=False)
+    names = abbrevs.map(STATES)
+    found = names.notna().to_numpy()
+
+    states = [[] for _ in locations]
+    for row, abbrev, name in zip(
+        exploded.index[found], abbrevs[found].tolist(), names[found].tolist()
+    ):
+        states[row] += [abbrev, name]
+    # deduplicated exactly like location_attrs, so the order matches as well
+    return [list(set(row_states)) for row_states in states]
+
+
+def _date_reprs(times: pd.Series) -> list[list[str]]:
+    if (times.dt.microsecond | times.dt.nanosecond).any():
+        iso = [time.isoformat() for time in times]
+    else:
+        iso = times.to_numpy().astype("datetime64[s]").astype(str).tolist()
+
+    local = times.dt.tz_localize("UTC").dt.tz_convert(LOCAL_TZ)
+    days, unique_days = pd.factorize(local.dt.normalize())
+    day_reprs = [day.strftime("%B %-d, %Y") for day in unique_days]
+    month_reprs = [day.strftime("%B %Y") for day in unique_days]
+    return [
+        [iso_repr, day_reprs[day], month_reprs[day]]
+        for iso_repr, day in zip(iso, days.tolist())
+    ]
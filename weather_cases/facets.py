@@ -0,0 +1,56 @@
+from collections import defaultdict
+from collections.abc import Iterable
+
+import numpy as np
+
+
+class FacetIndex:
+    """
+    Per-field value counts over registry positions, for the whole archive and
+    for any subset of it.
+
+    The positions of each value are stored back to back, with offsets per
+    value, so counting within a subset takes one gather and one cumulative
+    sum over all the postings of a field.
+    """
+
+    def __init__(self, fields: dict[str, list[Iterable]]):
+        self._fields = {}
+        for name, values_per_row in fields.items():
+            positions = defaultdict(list)
+            for idx, values in enumerate(values_per_row):
+                for value in set(values):
+                    positions[value].append(idx)
+
+            values = sorted(positions)
+            lengths = [len(positions[value]) for value in values]
+            offsets = np.cumsum([0] + lengths)
+            postings = np.array(
+                [idx for value in values for idx in positions[value]], dtype=np.int32
+            )
+            self._fields[name] = (values, offsets, postings)
+        self._totals = {
+            name: _to_dict(values, np.diff(offsets))
+            for name, (values, offsets, _) in self._fields.items()
+        }
+
+    def counts(self, subset: np.ndarray | None = None) -> dict[str, dict[str, int]]:
+        """
+        Count of each value per field, most common first, among the positions
+        where the boolean mask `subset` is set, or among all of them.
+        """
+        if subset is None:
+            return self._totals
+
+        counts = {}
+        for name, (values, offsets, postings) in self._fields.items():
+            hits = np.concatenate(([0], np.cumsum(subset[postings])))
+            counts[name] = _to_dict(values, hits[offsets[1:]] - hits[offsets[:-1]])
+        return counts
+
+
+def _to_dict(values: list, counts: np.ndarray) -> dict[str, int]:
+    order = sorted(
+        (-count, value) for value, count in zip(values, counts.tolist()) if count
+    )
+    return {str(value): -count for count, value in order}
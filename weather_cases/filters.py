@@ -0,0 +1,104 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CaseFilters:
+    states: tuple[str, ...] = ()
+    years: tuple[int, ...] = ()
+    tags: tuple[str, ...] = ()
+    magnitudes: tuple[str, ...] = ()
+    outbreaks: tuple[str, ...] = ()
+    start: date | None = None
+    end: date | None = None
+
+    def __bool__(self):
+        return any(
+            (
+                self.states,
+                self.years,
+                self.tags,
+                self.magnitudes,
+                self.outbreaks,
+                self.start,
+                self.end,
+            )
+        )
+
+
+class FilterIndex:
+    """
+    Per-value boolean masks over registry positions for the filterable
+    attributes, plus a datetime64 column for date bounds.
+    """
+
+    def __init__(
+        self,
+        states: list[Iterable[str]],
+        years: list[int],
+        tags: list[Iterable[str]],
+        magnitudes: list[str | None],
+        outbreaks: list[str | None],
+        times: list,
+    ):
+        self._size = len(times)
+        self._times = np.array(times, dtype="datetime64[ns]")
+        self._states = self._build_masks(states, _normalize)
+        self._years = self._build_masks([[year] for year in years], int)
+        self._tags = self._build_masks(tags, _normalize)
+        self._magnitudes = self._build_masks(
+            [[m] if m else [] for m in magnitudes], _normalize
+        )
+        self._outbreaks = self._build_masks(
+            [[o] if o else [] for o in outbreaks], _normalize
+        )
+
+    def mask(self, filters: CaseFilters) -> np.ndarray | None:
+        if not filters:
+            return None
+
+        mask = np.ones(self._size, dtype=bool)
+        for masks, values, normalize in (
+            (self._states, filters.states, _normalize),
+            (self._years, filters.years, int),
+            (self._tags, filters.tags, _normalize),
+            (self._magnitudes, filters.magnitudes, _normalize),
+            (self._outbreaks, filters.outbreaks, _normalize),
+        ):
+            if values:
+                mask &= self._any_of(masks, (normalize(v) for v in values))
+
+        if filters.start is not None:
+            mask &= self._times >= np.datetime64(filters.start, "ns")
+        if filters.end is not None:
+            end = np.datetime64(filters.end, "D") + np.timedelta64(1, "D")
+            mask &= self._times < end.astype("datetime64[ns]")
+        return mask
+
+    def _build_masks(self, values_per_row: list[Iterable], normalize) -> dict:
+        positions = defaultdict(list)
+        for idx, values in enumerate(values_per_row):
+            for value in values:
+                positions[normalize(value)].append(idx)
+
+        masks = {}
+        for value, idxs in positions.items():
+            mask = np.zeros(self._size, dtype=bool)
+            mask[idxs] = True
+            masks[value] = mask
+        return masks
+
+    def _any_of(self, masks: dict, values: Iterable) -> np.ndarray:
+        mask = np.zeros(self._size, dtype=bool)
+        for value in values:
+            if value in masks:
+                mask |= masks[value]
+        return mask
+
+
+def _normalize(value: str) -> str:
+    return value.strip().lower()
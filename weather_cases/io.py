@@ -1,38 +1,73 @@
+import hashlib
 import os
 from pathlib import Path
+import pickle
 import re
 import numpy as np
 import pandas as pd
 
-from weather_cases.extract import to_hash
+from weather_cases.extract import to_hashes
 
+# dtypes of the archive's CSV columns, by header; times are parsed separately
+ARCHIVE_SCHEMA = {
+    "event_name": str,
+    "time_start": str,
+    "time_end": str,
+    "country": str,
+    "lat": "float64",
+    "lon": "float64",
+    "magnitude": str,
+    "tags": str,
+    "features": str,
+    "records": str,
+    "nickname": str,
+    "outbreak": str,
+    "notes": str,
+    "user comments": str,
+    "photo/video": str,
+    "account/summary": str,
+}
+TIME_FORMAT = "%Y%m%d_%H%M"
+CSV_ENGINE = "c"
 
-def read_all_cases(with_id: bool = True) -> pd.DataFrame:
+# bump whenever ARCHIVE_SCHEMA or the parsing in parse_file changes
+SIDECAR_VERSION = 1
+
+
+def data_dir() -> str:
     parent = Path(__name__).parents[0].absolute()
-    datadir = os.path.join(parent, "data")
+    return os.path.join(parent, "data")
+
+
+def archive_files() -> list[str]:
+    datadir = data_dir()
+    return [
+        os.path.join(datadir, file)
+        for file in os.listdir(datadir)
+        if not file.startswith("_")
+        and (file.endswith(".csv") or file.endswith(".csv.gz"))
+    ]
+
+
+def read_all_cases(with_id: bool = True) -> pd.DataFrame:
     case_dfs = []
 
-    for file in os.listdir(datadir):
-        if not file.startswith("_") and (
-            file.endswith(".csv") or file.endswith(".csv.gz")
-        ):
-            case_dfs.append(read_file(os.path.join(datadir, file), with_id=with_id))
+    for file in archive_files():
+        case_dfs.append(read_file(file, with_id=with_id))
+
+    return combine_cases(case_dfs)
+
 
+def combine_cases(case_dfs: list[pd.DataFrame]) -> pd.DataFrame:
     full_df = pd.concat(case_dfs)
     full_df.sort_values(by=["time_start"], ascending=False, inplace=True)
     return full_df
 
 
-def read_file(file: str, with_id: bool, filter_incomplete: bool = True) -> pd.DataFrame:
-    df = pd.read_csv(file, skiprows=[1])
-
-    df["time_start"] = pd.to_datetime(
-        df.time_start, format="%Y%m%d_%H%M", errors="coerce"
-    )
-    df["time_end"] = pd.to_datetime(df.time_end, format="%Y%m%d_%H%M", errors="coerce")
-    df.rename(
-        columns={c: re.sub(r"[\s/]+", "_", c.lower()) for c in df.columns}, inplace=True
-    )
+def read_file(
+    file: str, with_id: bool, filter_incomplete: bool = True, engine: str = CSV_ENGINE
+) -> pd.DataFrame:
+    df = read_columns(file, engine=engine)
 
     if not filter_incomplete and with_id:
         raise ValueError("Incomplete data must be filtered out before generating id")
@@ -46,7 +81,7 @@ def read_file(file: str, with_id: bool, filter_incomplete: bool = True) -> pd.Da
         ]
 
     if with_id:
-        df["id"] = df.apply(to_hash, axis=1)
+        df["id"] = to_hashes(df)
 
     for col in ["outbreak", "nickname", "user_comments"]:
         df[col] = df[col].str.replace(r'[\'"]', "", regex=True)
@@ -54,3 +89,83 @@ def read_file(file: str, with_id: bool, filter_incomplete: bool = True) -> pd.Da
     df["event_name"] = df["event_name"].str.replace(r"-{2,}", "–", regex=True)
     df = df.replace({np.nan: None})
     return df
+
+
+def read_columns(file: str, engine: str = CSV_ENGINE) -> pd.DataFrame:
+    """
+    The typed columns of an archive file, from the sidecar file cached next to
+    it when that is still current, otherwise parsed and cached.
+
+    A sidecar is current when it was written for a file of the same size and
+    mtime, or, failing that, the same contents (e.g. a copied or touched file,
+    whose sidecar key is then refreshed).
+    """
+    stat = os.stat(file)
+    path = sidecar_path(file)
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    digest = None
+    cached = _read_sidecar(path)
+    if cached is not None:
+        cached_signature, cached_digest, df = cached
+        if cached_signature == signature:
+            return df
+        digest = file_md5(file)
+        if cached_digest == digest:
+            _write_sidecar(path, signature, digest, df)
+            return df
+
+    df = parse_file(file, engine=engine)
+    _write_sidecar(path, signature, digest or file_md5(file), df)
+    return df
+
+
+def parse_file(file: str, engine: str = CSV_ENGINE) -> pd.DataFrame:
+    # the row after the header holds units and descriptions
+    df = pd.read_csv(file, skiprows=[1], dtype=ARCHIVE_SCHEMA, engine=engine)
+
+    df["time_start"] = pd.to_datetime(
+        df.time_start, format=TIME_FORMAT, errors="coerce"
+    )
+    df["time_end"] = pd.to_datetime(df.time_end, format=TIME_FORMAT, errors="coerce")
+    df.rename(
+        columns={c: re.sub(r"[\s/]+", "_", c.lower()) for c in df.columns}, inplace=True
+    )
+    return df
+
+
+def sidecar_path(file: str) -> str:
+    # a leading underscore keeps archive_files from picking it up
+    directory, name = os.path.split(file)
+    return os.path.join(directory, f"_{name}.columns")
+
+
+def file_md5(file: str) -> str:
+    md5 = hashlib.md5()
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _read_sidecar(path: str) -> tuple | None:
+    try:
+        with open(path, "rb") as f:
+            version, signature, digest, df = pickle.load(f)
+    except Exception:
+        # missing, truncated, or written by incompatible library versions
+        return None
+    if version != SIDECAR_VERSION:
+        return None
+    return signature, digest, df
+
+
+def _write_sidecar(path: str, signature: tuple, digest: str, df: pd.DataFrame):
+    # write then rename so a concurrent reader never sees a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((SIDECAR_VERSION, signature, digest, df), f, protocol=5)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write archive sidecar {path}: {e}")
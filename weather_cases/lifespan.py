@@ -1,26 +1,66 @@
+import asyncio
 from contextlib import asynccontextmanager
+import os
 
 import aiohttp
+from dotenv import load_dotenv
 from fastapi import FastAPI
 
-from weather_cases.io import read_all_cases
+from weather_cases.environment.retrieve import RENDER_POOL
 from weather_cases.registry import WeatherCaseRegistry
+from weather_cases.reload import ArchiveReloader, follow, watch
+from weather_cases.utils.metrics import METRICS, CallbackMetric
 
-import matplotlib
+load_dotenv()
 
 
 REGISTRY = WeatherCaseRegistry()
+RELOADER = ArchiveReloader(REGISTRY)
+
+METRICS.register(
+    CallbackMetric(
+        "cases_search_cache_hits_total",
+        "Case searches answered from the search cache.",
+        "counter",
+        lambda: REGISTRY.search_cache_info.hits,
+    )
+)
+METRICS.register(
+    CallbackMetric(
+        "cases_search_cache_misses_total",
+        "Case searches that had to be scored.",
+        "counter",
+        lambda: REGISTRY.search_cache_info.misses,
+    )
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    REGISTRY.items = read_all_cases(with_id=False)
+    RELOADER.load()
+
+    # poll data/ for archive changes when an interval is configured
+    reload_interval = os.getenv("DATA_RELOAD_INTERVAL")
+    watcher = (
+        asyncio.create_task(watch(RELOADER, float(reload_interval)))
+        if reload_interval
+        else None
+    )
+    # pick up snapshots rebuilt by other workers, e.g. through /cases/reload
+    follower = asyncio.create_task(
+        follow(RELOADER, float(os.getenv("SNAPSHOT_FOLLOW_INTERVAL", "5")))
+    )
 
-    matplotlib.use("Agg")
+    # start and warm up the environment render workers before taking requests
+    await RENDER_POOL.start()
 
     # set up async http client
     app.state.http_client = aiohttp.ClientSession()
 
     yield
+    RENDER_POOL.shutdown()
+    follower.cancel()
+    if watcher:
+        watcher.cancel()
     if app.state.http_client:
         await app.state.http_client.close()
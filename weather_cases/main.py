@@ -1,13 +1,18 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
-from weather_cases.exceptions import DataNotFoundException
+from weather_cases.exceptions import (
+    DataNotFoundException,
+    QueueFullException,
+    WorkerUnavailableException,
+)
 from weather_cases.lifespan import lifespan
 from weather_cases.router import router as cases_router
 from weather_cases.environment.router import router as environment_router
 from weather_cases.soundings.router import router as soundings_router
+from weather_cases.utils.metrics import CONTENT_TYPE, METRICS, MetricsMiddleware
 
 app = FastAPI(lifespan=lifespan)
 
@@ -21,6 +26,8 @@ app.add_middleware(
 
 app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=9)
 
+app.add_middleware(MetricsMiddleware)
+
 
 @app.exception_handler(DataNotFoundException)
 async def data_not_found_handler(request: Request, exc: DataNotFoundException):
@@ -30,6 +37,31 @@ async def data_not_found_handler(request: Request, exc: DataNotFoundException):
     )
 
 
+@app.exception_handler(QueueFullException)
+async def queue_full_handler(request: Request, exc: QueueFullException):
+    return JSONResponse(
+        status_code=503,
+        content={"message": "Too many requests in progress, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(WorkerUnavailableException)
+async def worker_unavailable_handler(
+    request: Request, exc: WorkerUnavailableException
+):
+    return JSONResponse(
+        status_code=503,
+        content={"message": "Workers are restarting, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(content=METRICS.render(), media_type=CONTENT_TYPE)
+
+
 app.include_router(cases_router)
 app.include_router(environment_router)
 app.include_router(soundings_router)
@@ -22,3 +22,11 @@ class WeatherCase(BaseModel):
     user_comments: list[str] = Field(default_factory=list)
     photo_video: list[str] = Field(default_factory=list)
     account_summary: Optional[str] = Field(default=None)
+
+
+MAX_BATCH_QUERIES = 50
+
+
+class BatchSearchRequest(BaseModel):
+    queries: list[str] = Field(max_length=MAX_BATCH_QUERIES)
+    limit: int = Field(default=5)
@@ -0,0 +1,83 @@
+from collections import defaultdict
+import math
+
+import numpy as np
+
+
+# WRatio scales partial_ratio by 0.6 once one string is more than 8x longer than
+# the other, and partial_token_ratio additionally by 0.95
+LONG_RATIO = 8.0
+LONG_PARTIAL_SCALE = 0.6
+LONG_TOKEN_CEILING = 100 * LONG_PARTIAL_SCALE * 0.95
+
+
+class NgramIndex:
+    """
+    Character n-gram inverted index over pre-processed search strings.
+
+    Used to narrow a query down to the documents that could possibly reach
+    `min_score` under `rapidfuzz.fuzz.WRatio`, so that only those get scored.
+    """
+
+    def __init__(self, docs: list[str], n: int = 3):
+        self.n = n
+        self._lengths = np.array([len(doc) for doc in docs], dtype=np.int64)
+
+        postings = defaultdict(list)
+        for idx, doc in enumerate(docs):
+            for gram in ngrams(doc, n):
+                postings[gram].append(idx)
+
+        # sorted grams with one flat postings array, sliced by offsets
+        grams = sorted(postings)
+        self._grams = np.array(grams, dtype=f"U{n}")
+        self._offsets = np.cumsum([0] + [len(postings[gram]) for gram in grams])
+        self._postings = np.array(
+            [idx for gram in grams for idx in postings[gram]], dtype=np.int32
+        )
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def candidates(self, q: str, min_score: float) -> np.ndarray:
+        """
+        Indices (ascending) of all documents that may score at least `min_score`.
+
+        For documents more than 8x longer than the query, WRatio can only
+        exceed 57 through partial_ratio, which requires some window of the
+        document to be within a bounded indel distance of the query. By the
+        q-gram lemma such a document shares at least
+        `len(grams) - n * max_distance` of the query's n-grams. Shorter
+        documents are always returned and left to the scorer.
+        """
+        q_len = len(q)
+        is_long = self._lengths > LONG_RATIO * q_len
+
+        if q_len == 0 or min_score <= LONG_TOKEN_CEILING:
+            return np.arange(len(self))
+
+        required_ratio = min_score / (100 * LONG_PARTIAL_SCALE)
+        if required_ratio > 1:
+            return np.flatnonzero(~is_long)
+
+        grams = ngrams(q, self.n)
+        max_distance = math.floor((1 - required_ratio) * 2 * q_len + 1e-9)
+        min_shared = len(grams) - self.n * max_distance
+        if min_shared <= 0:
+            return np.arange(len(self))
+
+        shared = np.zeros(len(self), dtype=np.int64)
+        for gram in grams:
+            shared[self._lookup(gram)] += 1
+
+        return np.flatnonzero(~is_long | (shared >= min_shared))
+
+    def _lookup(self, gram: str) -> np.ndarray:
+        pos = np.searchsorted(self._grams, gram)
+        if pos == len(self._grams) or self._grams[pos] != gram:
+            return self._postings[:0]
+        return self._postings[self._offsets[pos] : self._offsets[pos + 1]]
+
+
+def ngrams(s: str, n: int) -> set[str]:
+    return {s[i : i + n] for i in range(len(s) - n + 1)}
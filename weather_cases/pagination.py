@@ -0,0 +1,62 @@
+import base64
+import binascii
+from dataclasses import asdict, dataclass, field
+from datetime import date
+import json
+
+from weather_cases.filters import CaseFilters
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Position in the results of a search, passed to clients as an opaque
+    string. It carries the search itself rather than a reference to state
+    kept by one process, so any worker can serve the next page by re-running
+    the (cached) search, as long as it serves the same registry build.
+    """
+
+    q: str
+    build_id: str
+    offset: int
+    filters: CaseFilters = field(default_factory=CaseFilters)
+
+    def encode(self) -> str:
+        filters = {
+            name: value.isoformat() if isinstance(value, date) else value
+            for name, value in asdict(self.filters).items()
+        }
+        raw = json.dumps(
+            [self.q, self.build_id, self.offset, filters], separators=(",", ":")
+        ).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "Cursor":
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            q, build_id, offset, filters = json.loads(raw)
+            filters = CaseFilters(
+                states=tuple(map(str, filters["states"])),
+                years=tuple(map(int, filters["years"])),
+                tags=tuple(map(str, filters["tags"])),
+                magnitudes=tuple(map(str, filters["magnitudes"])),
+                outbreaks=tuple(map(str, filters["outbreaks"])),
+                start=_date(filters["start"]),
+                end=_date(filters["end"]),
+            )
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+        if not (
+            isinstance(q, str)
+            and isinstance(build_id, str)
+            and isinstance(offset, int)
+            and offset >= 0
+        ):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return cls(q=q, build_id=build_id, offset=offset, filters=filters)
+
+
+def _date(value: str | None) -> date | None:
+    return date.fromisoformat(value) if value is not None else None
@@ -1,60 +1,572 @@
+import bisect
+from collections import Counter, defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass
-from thefuzz import process
+from datetime import date
+import uuid
+from rapidfuzz import fuzz, process
 
+import numpy as np
 import pandas as pd
 
-from weather_cases.extract import to_hash, to_searchable, to_weather_case
+from weather_cases.columns import CaseColumns, Fragments
+from weather_cases.extract import (
+    LIST_COLUMNS,
+    derive_columns,
+    make_searchable,
+    make_suggestion_terms,
+    make_weather_case,
+    normalize_query,
+    to_search_string,
+    to_searchable,
+)
+from weather_cases.facets import FacetIndex
+from weather_cases.filters import CaseFilters, FilterIndex
 from weather_cases.models import WeatherCase
+from weather_cases.ngrams import NgramIndex
+from weather_cases.similar import SimilarityIndex
+from weather_cases.spatial import SpatialIndex
+from weather_cases.suggest import Completion, PrefixIndex
+from weather_cases.timeindex import TimeIndex
+from weather_cases.typos import TypoIndex
+from weather_cases.utils.cache import CacheInfo, LRUCache
+
+
+@dataclass(frozen=True)
+class RegistryData:
+    """
+    Everything the registry derives from the case archive. Built once per
+    archive and never mutated afterwards, so it can be persisted and swapped
+    in as a whole.
+    """
+
+    build_id: str
+    columns: CaseColumns
+    items: dict
+    elements: list
+    element_positions: np.ndarray
+    element_index: np.ndarray
+    index: NgramIndex
+    suggestions: PrefixIndex
+    filters: FilterIndex
+    facets: FacetIndex
+    spatial: SpatialIndex
+    times: TimeIndex
+    similar: SimilarityIndex
+    typos: TypoIndex
+    years: dict[int, np.ndarray]
+    years_json: Fragments
+    year_slots: dict[int, int]
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return self.columns.to_dataframe()
+
+    @property
+    def search_strings(self) -> list[str]:
+        return self.columns.search_strings[self.element_positions].tolist()
+
+    @classmethod
+    def empty(cls) -> "RegistryData":
+        return cls.build(pd.DataFrame())
+
+    @classmethod
+    def build(
+        cls, df: pd.DataFrame, previous: "RegistryData | None" = None
+    ) -> "RegistryData":
+        """
+        Build from an archive DataFrame. The serialized case and search string
+        of `previous` are reused for rows whose id and contents are unchanged.
+        """
+        previous_items = {}
+        if previous is not None and previous.columns.names == list(df.columns):
+            previous_items = previous.items
+
+        derived = {col: values.tolist() for col, values in derive_columns(df).items()}
+        ids = derived["id"]
+        tags = derived["tags"]
+        outbreaks = _column_values(df, "outbreak")
+        json, search_strings = [], []
+        for pos, values in enumerate(df.to_dict("records")):
+            prev = previous_items.get(ids[pos])
+            if prev is not None and prev.values_equal(tuple(values.values())):
+                json.append(prev.json)
+                search_strings.append(prev.search_string)
+                continue
+
+            values.update({col: derived[col][pos] for col in LIST_COLUMNS})
+            weather_case = make_weather_case(values, ids[pos])
+            json.append(weather_case.__pydantic_serializer__.to_json(weather_case))
+            searchable = make_searchable(
+                locations=derived["locations"][pos],
+                states=derived["states"][pos],
+                date_reprs=derived["date_reprs"][pos],
+                tags=tags[pos],
+                outbreak=outbreaks[pos],
+            )
+            search_strings.append(to_search_string(searchable))
+
+        years = [time.year for time in _column_values(df, "time_start")]
+        states = derived["states"]
+        terms = [
+            make_suggestion_terms(locations, row_states, nickname, outbreak)
+            for locations, row_states, nickname, outbreak in zip(
+                derived["locations"],
+                states,
+                _column_values(df, "nickname"),
+                outbreaks,
+            )
+        ]
+        labels = [
+            row_tags + features for row_tags, features in zip(tags, derived["features"])
+        ]
+
+        columns = CaseColumns(df, json, search_strings)
+
+        # same semantics as building a dict from the rows: the first occurrence
+        # of an id sets its position in the registry, the last one its value
+        positions = {}
+        for pos, case_id in enumerate(ids):
+            positions[case_id] = pos
+        element_positions = np.fromiter(positions.values(), dtype=np.int64)
+        elements = [RegistryElement(columns, pos) for pos in element_positions]
+        element_index = np.full(len(columns), -1, dtype=np.int64)
+        element_index[element_positions] = np.arange(len(element_positions))
+
+        # every row is kept here, including rows whose id collides with another
+        year_positions = defaultdict(list)
+        for pos, year in enumerate(years):
+            year_positions[year].append(pos)
+
+        lats = _float_column(columns, "lat")[element_positions]
+        lons = _float_column(columns, "lon")[element_positions]
+        magnitudes = [e.columns.value("magnitude", e.pos) for e in elements]
+        outbreaks = [outbreaks[pos] for pos in element_positions]
+        times = [e.time_start for e in elements]
+
+        return cls(
+            build_id=uuid.uuid4().hex,
+            columns=columns,
+            items=dict(zip(positions.keys(), elements)),
+            elements=elements,
+            element_positions=element_positions,
+            element_index=element_index,
+            index=NgramIndex(columns.search_strings[element_positions].tolist()),
+            suggestions=PrefixIndex(
+                Counter(term for pos in element_positions for term in terms[pos])
+            ),
+            filters=FilterIndex(
+                states=[states[pos] for pos in element_positions],
+                years=[years[pos] for pos in element_positions],
+                tags=[tags[pos] for pos in element_positions],
+                magnitudes=magnitudes,
+                outbreaks=outbreaks,
+                times=times,
+            ),
+            facets=FacetIndex(
+                {
+                    "tag": [tags[pos] for pos in element_positions],
+                    # the abbreviation of each state, which filters accept too
+                    "state": [
+                        [s for s in states[pos] if len(s) == 2]
+                        for pos in element_positions
+                    ],
+                    "year": [[years[pos]] for pos in element_positions],
+                    "magnitude": [[m] if m else [] for m in magnitudes],
+                    "outbreak": [
+                        [o.strip()] if o and o.strip() else [] for o in outbreaks
+                    ],
+                }
+            ),
+            spatial=SpatialIndex(lats=lats, lons=lons),
+            times=TimeIndex(times),
+            typos=TypoIndex(
+                [_words(terms[pos]) for pos in element_positions],
+                known_words=_words(search_strings),
+            ),
+            similar=SimilarityIndex(
+                lats=lats,
+                lons=lons,
+                times=times,
+                labels=[labels[pos] for pos in element_positions],
+                magnitudes=magnitudes,
+            ),
+            years={
+                year: np.array(pos, dtype=np.int64)
+                for year, pos in year_positions.items()
+            },
+            years_json=Fragments(
+                json_list(columns.json[pos] for pos in pos_list)
+                for pos_list in year_positions.values()
+            ),
+            year_slots={year: slot for slot, year in enumerate(year_positions)},
+        )
+
+
+class ResultSet:
+    """
+    Search results kept for paging. Ranked in full the first time a page past
+    the first is requested.
+    """
+
+    def __init__(self, items: list):
+        self.items = items
+        self._ranked = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def page(self, offset: int, limit: int) -> list:
+        if self._ranked is None:
+            self._ranked = ranked(self.items)
+        return self._ranked[offset : offset + max(limit, 0)]
 
 
 class WeatherCaseRegistry:
-    def __init__(self):
-        self._items = {}
-        self._items_df = pd.DataFrame()
+    def __init__(
+        self,
+        search_cache_size: int = 1024,
+        result_sets_size: int = 256,
+        result_sets_ttl: float = 300,
+    ):
+        self._data = RegistryData.empty()
+        self._search_cache = LRUCache(maxsize=search_cache_size)
+        self._result_sets = LRUCache(maxsize=result_sets_size, ttl=result_sets_ttl)
 
     @property
     def items(self):
-        return self._items
+        return self._data.items
 
     @property
     def dataframe(self):
-        return self._items_df.copy()
+        return self._data.dataframe.copy()
 
     @items.setter
     def items(self, df: pd.DataFrame):
-        searchable_items = {
-            to_hash(row): RegistryElement(
-                searchable=to_searchable(row),
-                weather_case=to_weather_case(row),
-                row=row,
+        self.data = RegistryData.build(df)
+
+    @property
+    def data(self) -> RegistryData:
+        return self._data
+
+    @data.setter
+    def data(self, data: RegistryData):
+        # a single reference swap, so readers see either the old or the new data;
+        # cache keys carry the build id so late writes for old data never hit
+        self._data = data
+        self._search_cache.clear()
+
+    @property
+    def search_cache_info(self) -> CacheInfo:
+        return self._search_cache.info()
+
+    def search(
+        self, q: str, min_score: int = 60, filters: CaseFilters = CaseFilters()
+    ):
+        data = self._data
+        q = normalize_query(q)
+        cached = self._search_cache.get((data.build_id, q, min_score, filters))
+        if cached is not None:
+            return cached
+
+        # the query is scored as typed; a typo correction only adds the cases
+        # the dictionary lookup found for it, ranked below every scored case
+        _, matches = data.typos.resolve(q)
+        scored = _scored(data, q, min_score, filters)
+        items = _with_matches(data, scored, matches, min_score, filters)
+        self._search_cache.put((data.build_id, q, min_score, filters), items)
+        return items
+
+    def search_many(
+        self, qs: list[str], min_score: int = 60, filters: CaseFilters = CaseFilters()
+    ):
+        data = self._data
+        qs = [normalize_query(q) for q in qs]
+        results = [
+            self._search_cache.get((data.build_id, q, min_score, filters)) for q in qs
+        ]
+        uncached = {q for q, items in zip(qs, results) if items is None}
+        candidates = {q: _candidates(data, q, min_score, filters) for q in uncached}
+        found = {}
+
+        # score narrow and broad queries as separate matrices so that one broad
+        # query doesn't widen the matrix for the rest of the batch
+        is_broad = {q: len(c) > len(data.index) // 2 for q, c in candidates.items()}
+        for broad in (False, True):
+            rows = [q for q, b in is_broad.items() if b == broad]
+            if not rows:
+                continue
+
+            cols = np.unique(np.concatenate([candidates[q] for q in rows]))
+            scores = process.cdist(
+                rows,
+                data.columns.search_strings[data.element_positions[cols]].tolist(),
+                scorer=fuzz.WRatio,
+                processor=None,
+                score_cutoff=min_score,
+                dtype=np.float64,
+                # requests are served by several uvicorn workers already, so a
+                # single batch must not take every core
+                workers=1,
             )
-            for _, row in df.iterrows()
-        }
-        self._items = searchable_items
-        self._items_df = df
-
-    def search(self, q: str, min_score: int = 60):
-        return process.extractBests(
-            q,
-            self._items.values(),
-            limit=len(self._items),
-            processor=fuzz_preprocess,
-            score_cutoff=min_score,
-        )
 
-    def get_by_year(self, year: int):
-        cases_by_year = self._items_df[self._items_df["time_start"].dt.year == year]
-        return [to_weather_case(row) for _, row in cases_by_year.iterrows()]
+            for q, row in zip(rows, scores):
+                matched = np.flatnonzero(row >= min_score)
+                # same ordering as process.extract: score descending, then position
+                matched = matched[np.lexsort((matched, -row[matched]))]
+                scored = [(cols[pos], int(round(row[pos]))) for pos in matched]
+                _, matches = data.typos.resolve(q)
+                items = _with_matches(data, scored, matches, min_score, filters)
+                self._search_cache.put((data.build_id, q, min_score, filters), items)
+                found[q] = items
+
+        return [found[q] if items is None else items for q, items in zip(qs, results)]
+
+    @property
+    def build_id(self) -> str:
+        return self._data.build_id
+
+    def result_set(
+        self, q: str, build_id: str, filters: CaseFilters = CaseFilters()
+    ) -> ResultSet | None:
+        """
+        All results of searching `q`, kept so that follow-up pages are ranked
+        once per process, or None when the registry is no longer the build
+        `build_id` the first page came from.
+        """
+        data = self._data
+        if data.build_id != build_id:
+            return None
+        key = (build_id, normalize_query(q), filters)
+        results = self._result_sets.get(key)
+        if results is None:
+            results = ResultSet(self.search(q, filters=filters))
+            self._result_sets.put(key, results)
+        return results
+
+    def facets(
+        self, q: str | None = None, filters: CaseFilters = CaseFilters()
+    ) -> dict[str, dict[str, int]]:
+        """
+        Case counts per tag, state, year, magnitude and outbreak, among the
+        results of `q` when given, and otherwise among the cases matching
+        `filters`.
+        """
+        data = self._data
+        if q:
+            subset = np.zeros(len(data.elements), dtype=bool)
+            positions = [element.pos for element, _ in self.search(q, filters=filters)]
+            subset[data.element_index[positions]] = True
+        else:
+            subset = data.filters.mask(filters)
+        return data.facets.counts(subset)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[Completion]:
+        return self._data.suggestions.complete(prefix, limit)
+
+    def near(
+        self, lat: float, lon: float, radius_km: float
+    ) -> list[tuple["RegistryElement", float]]:
+        """Cases within `radius_km` of a point, nearest first, with distances in km."""
+        data = self._data
+        indices, distances = data.spatial.within_radius(lat, lon, radius_km)
+        return [
+            (data.elements[idx], float(distance))
+            for idx, distance in zip(indices, distances)
+        ]
+
+    def within_bbox(
+        self, south: float, west: float, north: float, east: float
+    ) -> list["RegistryElement"]:
+        data = self._data
+        indices = data.spatial.within_bbox(south, west, north, east)
+        return [data.elements[idx] for idx in indices]
+
+    def between(
+        self, start: date | None = None, end: date | None = None, any_year=False
+    ) -> list["RegistryElement"]:
+        """
+        Cases starting within the date range, newest first. With `any_year`
+        only the month and day of the bounds are used.
+        """
+        data = self._data
+        if any_year:
+            positions = data.times.in_calendar_window(start, end)
+        else:
+            positions = data.times.between(start, end)
+        return [data.elements[pos] for pos in positions]
+
+    def similar(
+        self, case_id: str, k: int = 5
+    ) -> list[tuple["RegistryElement", float]]:
+        """The `k` cases closest to `case_id` in feature space, nearest first."""
+        data = self._data
+        idx = data.element_index[data.items[case_id].pos]
+        indices, distances = data.similar.nearest(idx, k)
+        return [
+            (data.elements[i], float(distance))
+            for i, distance in zip(indices, distances)
+        ]
+
+    def get_by_year(self, year: int) -> list[WeatherCase]:
+        data = self._data
+        return [
+            WeatherCase.model_validate_json(data.columns.json[pos])
+            for pos in data.years.get(year, [])
+        ]
+
+    def get_by_year_json(self, year: int) -> bytes:
+        data = self._data
+        slot = data.year_slots.get(year)
+        return b"[]" if slot is None else data.years_json[slot]
+
+
+def _scored(
+    data: RegistryData, q: str, min_score: int, filters: CaseFilters
+) -> list[tuple[int, int]]:
+    """(element index, score) pairs of the candidates scoring at least `min_score`."""
+    candidates = _candidates(data, q, min_score, filters)
+    results = process.extract(
+        q,
+        data.columns.search_strings[data.element_positions[candidates]].tolist(),
+        scorer=fuzz.WRatio,
+        processor=None,
+        score_cutoff=min_score,
+        limit=None,
+    )
+    return [(candidates[pos], int(round(score))) for _, score, pos in results]
+
+
+def _candidates(data: RegistryData, q: str, min_score: int, filters: CaseFilters):
+    candidates = data.index.candidates(q, min_score)
+    mask = data.filters.mask(filters)
+    if mask is None:
+        return candidates
+    return candidates[mask[candidates]]
+
+
+def _words(terms: Iterable[str]) -> set[str]:
+    return {word for term in terms for word in normalize_query(term).split()}
+
+
+def _column_values(df: pd.DataFrame, name: str) -> list:
+    return df[name].tolist() if name in df.columns else []
+
+
+def _float_column(columns: CaseColumns, name: str) -> np.ndarray:
+    if name not in columns.columns:
+        return np.empty(len(columns), dtype=np.float64)
+    return columns.columns[name].astype(np.float64)
+
+
+def _with_matches(
+    data: RegistryData,
+    scored: list[tuple[int, int]],
+    matches: np.ndarray | None,
+    min_score: int,
+    filters: CaseFilters,
+) -> list[tuple["RegistryElement", int]]:
+    """
+    Scored (element index, score) pairs as elements, followed at `min_score`
+    by the typo-dictionary matches of a corrected query that weren't scored
+    high enough. Scores are at least `min_score`, so the result stays in score
+    order.
+    """
+    if matches is not None:
+        mask = data.filters.mask(filters)
+        if mask is not None:
+            matches = matches[mask[matches]]
+        seen = {idx for idx, _ in scored}
+        scored = scored + [(idx, min_score) for idx in matches if idx not in seen]
+    return [(data.elements[idx], score) for idx, score in scored]
 
 
-@dataclass
 class RegistryElement:
-    searchable: dict
-    weather_case: WeatherCase
-    row: pd.Series
+    """
+    Handle to one row of a CaseColumns store. Case objects are only
+    materialized when accessed.
+    """
+
+    __slots__ = ("columns", "pos")
+
+    def __init__(self, columns: CaseColumns, pos: int):
+        self.columns = columns
+        self.pos = int(pos)
+
+    @property
+    def json(self) -> bytes:
+        return self.columns.json[self.pos]
+
+    @property
+    def search_string(self) -> str:
+        return self.columns.search_strings[self.pos]
+
+    @property
+    def time_start(self) -> pd.Timestamp:
+        return self.columns.value("time_start", self.pos)
+
+    @property
+    def row(self) -> pd.Series:
+        return self.columns.row(self.pos)
+
+    @property
+    def searchable(self) -> dict:
+        return to_searchable(self.row)
+
+    @property
+    def weather_case(self) -> WeatherCase:
+        return WeatherCase.model_validate_json(self.json)
+
+    def row_equals(self, row: pd.Series) -> bool:
+        return list(row.index) == self.columns.names and self.values_equal(tuple(row))
+
+    def values_equal(self, values: tuple) -> bool:
+        """Whether `values`, in column order, are this row's values."""
+        return self.columns.row_values(self.pos) == values
+
+
+def top_k(items: list, limit: int) -> list:
+    """
+    The first `limit` of `items` ordered by (score, time_start) descending,
+    same as a full stable sort. `items` must already be ordered by score
+    descending, as returned by search, so everything after the tied run at the
+    k-th score can be skipped without looking at it, and only the tied run
+    needs its start times compared.
+    """
+    if limit <= 0:
+        return []
+    if len(items) <= limit:
+        return ranked(items)
+
+    kth_score = items[limit - 1][1]
+    start = bisect.bisect_left(items, -kth_score, hi=limit, key=_negated_score)
+    end = bisect.bisect_right(items, -kth_score, lo=limit, key=_negated_score)
+
+    tied = items[start:end]
+    times = _time_keys(tied)
+    newest = np.lexsort((np.arange(len(tied)), -times))[: limit - start]
+    return ranked(items[:start]) + [tied[i] for i in newest]
+
+
+def ranked(items: list) -> list:
+    """All of `items` ordered by (score, time_start) descending, ties kept in order."""
+    if not items:
+        return []
+    scores = np.fromiter((score for _, score in items), dtype=np.int64)
+    order = np.lexsort((np.arange(len(items)), -_time_keys(items), -scores))
+    return [items[i] for i in order]
+
+
+def _negated_score(item) -> int:
+    return -item[1]
+
+
+def _time_keys(items: list) -> np.ndarray:
+    columns = items[0][0].columns
+    positions = np.fromiter((case.pos for case, _ in items), dtype=np.int64)
+    times = columns.columns["time_start"][positions]
+    return times.astype("datetime64[ns]").view(np.int64)
 
 
-def fuzz_preprocess(elem: RegistryElement | str):
-    if isinstance(elem, str):
-        return elem
-    return elem.searchable
+def json_list(fragments: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
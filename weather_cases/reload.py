@@ -0,0 +1,169 @@
+import asyncio
+from dataclasses import dataclass, field
+import os
+from threading import Lock
+
+import pandas as pd
+
+from weather_cases.io import archive_files, combine_cases, read_file
+from weather_cases.registry import RegistryData, WeatherCaseRegistry
+from weather_cases.snapshot import (
+    archive_hash,
+    load_or_build,
+    load_registry_data,
+    read_snapshot,
+    snapshot_hash,
+    snapshot_path,
+)
+
+type FileSignature = tuple[int, int]
+type SnapshotSignature = tuple[int, int, int] | None
+
+
+@dataclass(frozen=True)
+class ReloadResult:
+    changed_files: list[str] = field(default_factory=list)
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+
+
+class ArchiveReloader:
+    """
+    Rebuilds a registry when archive files in `data/` change.
+
+    Only files whose size or mtime changed are re-read, and only rows that
+    are new or differ from the current registry are turned into new
+    elements. The finished RegistryData is written as the registry snapshot
+    and the registry swaps to the mapped snapshot in one step.
+
+    Every worker process has its own reloader. The first one to notice a
+    change rebuilds; `follow` lets the others pick up the snapshot it wrote,
+    so all workers serve the same data from one shared mapping.
+    """
+
+    def __init__(self, registry: WeatherCaseRegistry, path: str | None = None):
+        self.registry = registry
+        self._path = path
+        self._signatures: dict[str, FileSignature] = {}
+        self._frames: dict[str, pd.DataFrame] = {}
+        self._snapshot: SnapshotSignature = None
+        self._lock = Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path or snapshot_path()
+
+    def prime(self) -> None:
+        """Record the current archive files as the ones the registry was built from."""
+        with self._lock:
+            self._signatures = {file: _signature(file) for file in archive_files()}
+
+    def load(self) -> None:
+        """Load the registry from its snapshot, building it if needed."""
+        # record the archive files and snapshot before reading them so changes
+        # made while loading are picked up by the next reload or follow
+        self.prime()
+        with self._lock:
+            self._snapshot = _snapshot_signature(self.path)
+        self.registry.data = load_registry_data(self.path)
+
+    def follow(self) -> bool:
+        """
+        Swap to the registry snapshot if another process has rewritten it
+        since this one last loaded or wrote it. Returns whether it swapped.
+        """
+        with self._lock:
+            signature = _snapshot_signature(self.path)
+            if signature is None or signature == self._snapshot:
+                return False
+            self._snapshot = signature
+
+            content_hash = snapshot_hash(self.path)
+            data = read_snapshot(content_hash, self.path) if content_hash else None
+            if data is None:
+                return False
+
+            self.registry.data = data
+            # the snapshot was built from the archive as it is now
+            self._signatures = {file: _signature(file) for file in archive_files()}
+            self._frames = {}
+            return True
+
+    def reload(self) -> ReloadResult:
+        with self._lock:
+            files = archive_files()
+            signatures = {file: _signature(file) for file in files}
+            changed = [f for f in files if signatures[f] != self._signatures.get(f)]
+            changed += [f for f in self._signatures if f not in signatures]
+            if not changed:
+                return ReloadResult()
+
+            for file in files:
+                if file in changed or file not in self._frames:
+                    self._frames[file] = read_file(file, with_id=False)
+            self._frames = {file: self._frames[file] for file in files}
+            self._signatures = signatures
+
+            previous = self.registry.data
+            data = load_or_build(
+                archive_hash(files),
+                lambda: RegistryData.build(
+                    combine_cases(list(self._frames.values())), previous=previous
+                ),
+                self.path,
+            )
+            self._snapshot = _snapshot_signature(self.path)
+            self.registry.data = data
+
+            return ReloadResult(
+                changed_files=changed,
+                added=len(data.items.keys() - previous.items.keys()),
+                updated=sum(
+                    1
+                    for case_id, elem in data.items.items()
+                    if case_id in previous.items
+                    and previous.items[case_id].json != elem.json
+                ),
+                removed=len(previous.items.keys() - data.items.keys()),
+            )
+
+
+async def watch(reloader: ArchiveReloader, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await asyncio.to_thread(reloader.reload)
+        except Exception as e:
+            print(f"Reloading case archive failed: {e}")
+            continue
+
+        if result.changed_files:
+            print(f"Reloaded case archive: {result}")
+
+
+async def follow(reloader: ArchiveReloader, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            swapped = await asyncio.to_thread(reloader.follow)
+        except Exception as e:
+            print(f"Following registry snapshot failed: {e}")
+            continue
+
+        if swapped:
+            print("Loaded registry snapshot written by another worker")
+
+
+def _signature(file: str) -> FileSignature:
+    stat = os.stat(file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _snapshot_signature(path: str) -> SnapshotSignature:
+    # the snapshot is replaced by a rename, so a new inode means a new snapshot
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
@@ -1,32 +1,223 @@
-from fastapi import HTTPException
-from weather_cases.lifespan import REGISTRY
-from weather_cases.models import WeatherCase
+from datetime import date
+import hmac
+import os
+from typing import Annotated
+
+from fastapi import Depends, Header, HTTPException, Query, Response
+from weather_cases.filters import CaseFilters
+from weather_cases.lifespan import REGISTRY, RELOADER
+from weather_cases.models import BatchSearchRequest, WeatherCase
+from weather_cases.pagination import Cursor
+from weather_cases.registry import RegistryElement, json_list, top_k
+from weather_cases.reload import ReloadResult
+from weather_cases.suggest import MAX_SUGGESTIONS, Completion
+from weather_cases.utils.cache import CacheInfo
 
 from fastapi import APIRouter
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# most cases a single spatial or date query returns
+MAX_LIMIT = 1000
+
+
+def case_filters(
+    state: Annotated[list[str], Query()] = [],
+    year: Annotated[list[int], Query()] = [],
+    tag: Annotated[list[str], Query()] = [],
+    magnitude: Annotated[list[str], Query()] = [],
+    outbreak: Annotated[list[str], Query()] = [],
+    start: Annotated[date | None, Query(alias="from")] = None,
+    end: Annotated[date | None, Query(alias="to")] = None,
+) -> CaseFilters:
+    return CaseFilters(
+        states=tuple(state),
+        years=tuple(year),
+        tags=tuple(tag),
+        magnitudes=tuple(magnitude),
+        outbreaks=tuple(outbreak),
+        start=start,
+        end=end,
+    )
+
+
+@router.get("/search", response_model=list[WeatherCase])
+def search_cases(
+    filters: Annotated[CaseFilters, Depends(case_filters)],
+    q: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = 5,
+    cursor: str | None = None,
+    accept: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Search cases. When more results remain, the `X-Next-Cursor` response header
+    holds a cursor that returns the next page when passed back as `cursor`
+    together with `limit`; `q` and the filters may then be left out, and are
+    ignored if given. Send `Accept: application/x-ndjson` to get one case per
+    line instead of a JSON array.
+    """
+    if cursor is not None:
+        try:
+            position = Cursor.decode(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # any worker can serve the cursor by re-running its search, unless the
+        # registry has been reloaded since the first page
+        results = REGISTRY.result_set(
+            position.q, position.build_id, filters=position.filters
+        )
+        if results is None:
+            raise HTTPException(status_code=410, detail="Cursor has expired")
+        page = results.page(position.offset, limit)
+        total, offset = len(results), position.offset
+        q, filters, build_id = position.q, position.filters, position.build_id
+    elif q is None:
+        raise HTTPException(
+            status_code=422, detail="Either `q` or `cursor` is required"
+        )
+    else:
+        build_id = REGISTRY.build_id
+        items = REGISTRY.search(q, filters=filters)
+        page = top_k(items, limit)
+        total, offset = len(items), 0
+
+    headers = {}
+    next_offset = offset + len(page)
+    if len(page) > 0 and next_offset < total:
+        headers["X-Next-Cursor"] = Cursor(q, build_id, next_offset, filters).encode()
+
+    cases = [case for case, _ in page]
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        # the page is ranked in full before the first line is known, so there
+        # is nothing to gain from streaming it
+        return Response(
+            b"".join(case.json + b"\n" for case in cases),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+    return _json_response(json_list(case.json for case in cases), headers=headers)
+
+
+@router.post("/search/batch", response_model=list[list[WeatherCase]])
+def search_cases_batch(request: BatchSearchRequest) -> Response:
+    results = REGISTRY.search_many(request.queries)
+    return _json_response(
+        json_list(_top_cases_json(items, request.limit) for items in results)
+    )
+
+
+@router.get("/suggest")
+def suggest_cases(
+    prefix: str, limit: Annotated[int, Query(ge=1, le=MAX_SUGGESTIONS)] = 10
+) -> list[Completion]:
+    return REGISTRY.suggest(prefix, limit)
+
+
+@router.get("/facets")
+def get_facets(
+    filters: Annotated[CaseFilters, Depends(case_filters)], q: str | None = None
+) -> dict[str, dict[str, int]]:
+    """
+    Case counts per tag, state, year, magnitude and outbreak, most common
+    first, among the search results for `q` if given, otherwise among the
+    cases matching the filters.
+    """
+    return REGISTRY.facets(q, filters=filters)
+
+
+@router.get("/near", response_model=list[WeatherCase])
+def get_cases_near(
+    lat: Annotated[float, Query(ge=-90, le=90)],
+    lon: Annotated[float, Query(ge=-180, le=180)],
+    radius_km: Annotated[float, Query(gt=0)],
+    limit: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = 50,
+) -> Response:
+    items = REGISTRY.near(lat, lon, radius_km)
+    return _json_response(json_list(case.json for case, _ in items[:limit]))
+
 
-@router.get("/search")
-def search_cases(q: str, limit: int = 5) -> list[WeatherCase]:
-    items = REGISTRY.search(q)
-    sorted_items = sorted(items, key=_sort_by_score_and_date, reverse=True)
-    return [case.weather_case for i, (case, _) in enumerate(sorted_items) if i < limit]
+@router.get("/bbox", response_model=list[WeatherCase])
+def get_cases_in_bbox(
+    south: Annotated[float, Query(ge=-90, le=90)],
+    west: Annotated[float, Query(ge=-180, le=180)],
+    north: Annotated[float, Query(ge=-90, le=90)],
+    east: Annotated[float, Query(ge=-180, le=180)],
+    limit: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = 50,
+) -> Response:
+    cases = REGISTRY.within_bbox(south, west, north, east)
+    return _json_response(json_list(case.json for case in cases[:limit]))
 
 
-@router.get("/{case_id}")
-def get_case_by_id(case_id: str) -> WeatherCase:
+@router.get("/range", response_model=list[WeatherCase])
+def get_cases_in_range(
+    start: Annotated[date | None, Query(alias="from")] = None,
+    end: Annotated[date | None, Query(alias="to")] = None,
+    any_year: bool = False,
+    limit: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = 50,
+) -> Response:
+    """
+    Cases starting between `from` and `to`, newest first. With `any_year` a
+    window whose start is later in the year than its end wraps around the
+    new year; otherwise `from` must not be after `to`.
+    """
+    if not any_year and start and end and start > end:
+        raise HTTPException(status_code=422, detail="`from` is after `to`")
+    cases = REGISTRY.between(start, end, any_year=any_year)
+    return _json_response(json_list(case.json for case in cases[:limit]))
+
+
+@router.get("/search/cache")
+def search_cache_info() -> CacheInfo:
+    return REGISTRY.search_cache_info
+
+
+@router.post("/reload")
+def reload_cases(x_admin_token: Annotated[str | None, Header()] = None) -> ReloadResult:
+    """
+    Rebuild the registry from changed archive files. Only the worker serving
+    the request rebuilds; it rewrites the registry snapshot, and the other
+    workers swap to it within `SNAPSHOT_FOLLOW_INTERVAL` seconds.
+    """
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token or not hmac.compare_digest(
+        (x_admin_token or "").encode(), admin_token.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return RELOADER.reload()
+
+
+@router.get("/{case_id}", response_model=WeatherCase)
+def get_case_by_id(case_id: str) -> Response:
     try:
-        return REGISTRY.items[case_id].weather_case
+        return _json_response(REGISTRY.items[case_id].json)
     except KeyError:
         raise HTTPException(status_code=404, detail="Case not found")
 
 
-@router.get("/year/{year}")
-def get_cases_by_year(year: int) -> list[WeatherCase]:
-    return REGISTRY.get_by_year(year)
+@router.get("/{case_id}/similar", response_model=list[WeatherCase])
+def get_similar_cases(
+    case_id: str, k: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = 5
+) -> Response:
+    try:
+        items = REGISTRY.similar(case_id, k)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Case not found")
+    return _json_response(json_list(case.json for case, _ in items))
+
+
+@router.get("/year/{year}", response_model=list[WeatherCase])
+def get_cases_by_year(year: int) -> Response:
+    return _json_response(REGISTRY.get_by_year_json(year))
+
+
+def _json_response(content: bytes, headers: dict | None = None) -> Response:
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _top_cases(items, limit: int) -> list[RegistryElement]:
+    return [case for case, _ in top_k(items, limit)]
 
 
-def _sort_by_score_and_date(item):
-    case, score = item
-    return score, case.weather_case.time_start
+def _top_cases_json(items, limit: int) -> bytes:
+    return json_list(case.json for case in _top_cases(items, limit))
@@ -0,0 +1,100 @@
+from collections import Counter
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+from weather_cases.spatial import to_xyz
+
+# relative weight of each feature group in the distance
+LOCATION_WEIGHT = 10.0
+SEASON_WEIGHT = 1.0
+HOUR_WEIGHT = 0.5
+TAG_WEIGHT = 0.5
+MAGNITUDE_WEIGHT = 0.5
+
+# one-hot columns are only kept for the most common values
+MAX_VOCABULARY = 256
+MIN_VALUE_COUNT = 2
+
+
+class SimilarityIndex:
+    """
+    Dense feature matrix with one row per case, for nearest-neighbour
+    ("analog event") queries.
+
+    Each row holds the location on the unit sphere, the day of year and hour
+    of the start time as points on the unit circle, and one-hot columns for
+    tags/features and magnitude, each group scaled by its weight. Rows and
+    their squared norms are kept contiguous so a query is one matrix-vector
+    product.
+    """
+
+    def __init__(
+        self,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        times: list,
+        labels: list[Iterable[str]],
+        magnitudes: list[str | None],
+    ):
+        times = pd.DatetimeIndex(np.array(times, dtype="datetime64[ns]"))
+        season = 2 * np.pi * (times.dayofyear.to_numpy() - 1) / 365.25
+        hour = 2 * np.pi * (times.hour.to_numpy() + times.minute.to_numpy() / 60) / 24
+
+        labels = [{_normalize(label) for label in row} for row in labels]
+        magnitudes = [{_normalize(m)} if m else set() for m in magnitudes]
+
+        self._matrix = np.ascontiguousarray(
+            np.hstack(
+                (
+                    LOCATION_WEIGHT * to_xyz(lats, lons),
+                    SEASON_WEIGHT * np.column_stack((np.sin(season), np.cos(season))),
+                    HOUR_WEIGHT * np.column_stack((np.sin(hour), np.cos(hour))),
+                    TAG_WEIGHT * _one_hot(labels),
+                    MAGNITUDE_WEIGHT * _one_hot(magnitudes),
+                )
+            ),
+            dtype=np.float32,
+        )
+        self._norms = np.einsum("ij,ij->i", self._matrix, self._matrix)
+
+    def __len__(self):
+        return len(self._matrix)
+
+    def nearest(self, idx: int, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Indices of the `k` cases closest to case `idx`, excluding itself, and
+        their distances, nearest first.
+        """
+        query = self._matrix[idx]
+        distances = self._norms - 2 * (self._matrix @ query) + self._norms[idx]
+        distances[idx] = np.inf
+
+        k = min(k, len(self) - 1)
+        if k <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.lexsort((top, distances[top]))]
+        return top, np.sqrt(np.maximum(distances[top], 0))
+
+
+def _one_hot(values_per_row: list[set[str]]) -> np.ndarray:
+    counts = Counter(value for values in values_per_row for value in values)
+    vocabulary = {
+        value: col
+        for col, (value, count) in enumerate(counts.most_common(MAX_VOCABULARY))
+        if count >= MIN_VALUE_COUNT
+    }
+
+    matrix = np.zeros((len(values_per_row), len(vocabulary)), dtype=np.float32)
+    for row, values in enumerate(values_per_row):
+        for value in values:
+            if value in vocabulary:
+                matrix[row, vocabulary[value]] = 1
+    return matrix
+
+
+def _normalize(value: str) -> str:
+    return value.strip().lower()
@@ -0,0 +1,216 @@
+from collections.abc import Callable
+from contextlib import contextmanager
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from weather_cases.io import archive_files, data_dir, read_all_cases
+from weather_cases.registry import RegistryData
+
+# bump whenever RegistryData or anything it holds changes shape
+SNAPSHOT_VERSION = 10
+SNAPSHOT_MAGIC = b"WCREG"
+SNAPSHOT_FILE = "_registry.snapshot"
+
+# magic, format version, md5 hex digest of the archive files, pickle length,
+# number of out-of-band buffers
+_HEADER = struct.Struct(f"<{len(SNAPSHOT_MAGIC)}sH32sQI")
+# offset and length of one out-of-band buffer
+_BUFFER = struct.Struct("<QQ")
+_ALIGNMENT = 64
+
+
+def snapshot_path() -> str:
+    return os.path.join(data_dir(), SNAPSHOT_FILE)
+
+
+def archive_hash(files: list[str] | None = None) -> str:
+    md5 = hashlib.md5()
+    for file in sorted(files if files is not None else archive_files()):
+        md5.update(os.path.basename(file).encode())
+        with open(file, "rb") as f:
+            md5.update(f.read())
+    return md5.hexdigest()
+
+
+def write_snapshot(data: RegistryData, content_hash: str, path: str) -> None:
+    """
+    Pickle `data` with its NumPy arrays written out-of-band after the pickle,
+    each aligned so that `read_snapshot` can map them straight from the file.
+    """
+    buffers = []
+    payload = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [buffer.raw() for buffer in buffers]
+
+    table_end = _HEADER.size + _BUFFER.size * len(raw_buffers)
+    offset = table_end + len(payload)
+    layout = []
+    for raw in raw_buffers:
+        offset = _align(offset)
+        layout.append((offset, raw.nbytes))
+        offset += raw.nbytes
+
+    # write then rename so a concurrent reader never sees a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                content_hash.encode(),
+                len(payload),
+                len(raw_buffers),
+            )
+        )
+        for buffer_offset, nbytes in layout:
+            f.write(_BUFFER.pack(buffer_offset, nbytes))
+        f.write(payload)
+        for (buffer_offset, _), raw in zip(layout, raw_buffers):
+            f.write(b"\0" * (buffer_offset - f.tell()))
+            f.write(raw)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(content_hash: str, path: str) -> RegistryData | None:
+    """
+    Load a snapshot written by `write_snapshot`. The out-of-band arrays are
+    read-only views of a shared memory map of the file, so every process
+    loading the same snapshot shares one copy of them in the page cache.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        # missing or empty
+        return None
+
+    if len(buffer) < _HEADER.size:
+        return None
+
+    magic, version, snapshot_hash, payload_size, n_buffers = _HEADER.unpack_from(
+        buffer
+    )
+    if (
+        magic != SNAPSHOT_MAGIC
+        or version != SNAPSHOT_VERSION
+        or snapshot_hash.decode() != content_hash
+    ):
+        return None
+
+    view = memoryview(buffer)
+    table_end = _HEADER.size + _BUFFER.size * n_buffers
+    try:
+        layout = [
+            _BUFFER.unpack_from(buffer, _HEADER.size + _BUFFER.size * i)
+            for i in range(n_buffers)
+        ]
+        return pickle.loads(
+            view[table_end : table_end + payload_size],
+            buffers=[view[offset : offset + nbytes] for offset, nbytes in layout],
+        )
+    except Exception:
+        # truncated, or written by incompatible library versions; treat it as stale
+        return None
+
+
+def load_registry_data(path: str | None = None) -> RegistryData:
+    """
+    Load the registry from its snapshot, rebuilding (and re-writing the
+    snapshot) when the archive files have changed since it was written.
+
+    When several worker processes start together, only the first one builds;
+    the others wait for its snapshot and map it.
+    """
+    return load_or_build(
+        archive_hash(),
+        lambda: RegistryData.build(read_all_cases(with_id=False)),
+        path or snapshot_path(),
+    )
+
+
+def load_or_build(
+    content_hash: str, build: Callable[[], RegistryData], path: str
+) -> RegistryData:
+    """
+    Map the snapshot for `content_hash`, or call `build` and write its result
+    as the snapshot first. Only one process builds at a time; the others wait
+    and map what it wrote.
+    """
+    data = read_snapshot(content_hash, path)
+    if data is not None:
+        return data
+
+    with _build_lock(path):
+        data = read_snapshot(content_hash, path)
+        if data is not None:
+            return data
+
+        data = build()
+        try:
+            write_snapshot(data, content_hash, path)
+        except OSError as e:
+            print(f"Could not write registry snapshot to {path}: {e}")
+            return data
+
+    # map the snapshot just written rather than keeping a private copy
+    return read_snapshot(content_hash, path) or data
+
+
+def snapshot_hash(path: str) -> str | None:
+    """The archive hash a snapshot was written for, without loading it."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return None
+
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, content_hash, _, _ = _HEADER.unpack(header)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    return content_hash.decode()
+
+
+def build_snapshot() -> None:
+    path = snapshot_path()
+    content_hash = archive_hash()
+    data = RegistryData.build(read_all_cases(with_id=False))
+    write_snapshot(data, content_hash, path)
+    print(f"Wrote registry snapshot {content_hash} to {path}")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+@contextmanager
+def _build_lock(path: str):
+    if fcntl is None:
+        yield
+        return
+
+    try:
+        lock_file = open(f"{path}.lock", "w")
+    except OSError:
+        # e.g. a read-only data directory, where the snapshot can't be written either
+        yield
+        return
+
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+if __name__ == "__main__":
+    build_snapshot()
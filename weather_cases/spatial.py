@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class SpatialIndex:
+    """
+    Fixed lat/lon grid over points on the unit sphere.
+
+    Points are sorted by grid cell with one offsets array per cell, so a
+    query only gathers the cells overlapping its bounds and filters those
+    candidates exactly.
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_deg: float = 1.0):
+        self.cell_deg = cell_deg
+        self._n_lat = math.ceil(180 / cell_deg)
+        self._n_lon = math.ceil(360 / cell_deg)
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = _wrap_lon(np.asarray(lons, dtype=np.float64))
+        cells = self._lat_bin(lats) * self._n_lon + self._lon_bin(lons)
+
+        self._order = np.argsort(cells, kind="stable")
+        self._offsets = np.searchsorted(
+            cells[self._order], np.arange(self._n_lat * self._n_lon + 1)
+        )
+        self._lats = lats[self._order]
+        self._lons = lons[self._order]
+        self._xyz = to_xyz(self._lats, self._lons)
+
+    def __len__(self):
+        return len(self._order)
+
+    def within_radius(
+        self, lat: float, lon: float, radius_km: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Indices of points within `radius_km`, nearest first, and their distances."""
+        angle = radius_km / EARTH_RADIUS_KM
+        if angle >= math.pi:
+            south, north, west, east = -90.0, 90.0, -180.0, 180.0
+        else:
+            dlat = math.degrees(angle)
+            south, north = lat - dlat, lat + dlat
+            pole_cos = math.cos(math.radians(min(90.0, max(abs(south), abs(north)))))
+            if north >= 90 or south <= -90 or math.sin(angle) >= pole_cos:
+                west, east = -180.0, 180.0
+            else:
+                dlon = math.degrees(math.asin(math.sin(angle) / pole_cos))
+                west, east = lon - dlon, lon + dlon
+
+        rows = self._gather(south, west, north, east)
+        cos_angle = self._xyz[rows] @ to_xyz(np.array([lat]), np.array([lon]))[0]
+        distances = np.arccos(np.clip(cos_angle, -1, 1)) * EARTH_RADIUS_KM
+        within = distances <= radius_km
+
+        rows, distances = rows[within], distances[within]
+        order = np.lexsort((self._order[rows], distances))
+        return self._order[rows[order]], distances[order]
+
+    def within_bbox(
+        self, south: float, west: float, north: float, east: float
+    ) -> np.ndarray:
+        """
+        Indices (ascending) of points inside the box. A box with `west > east`
+        crosses the antimeridian.
+        """
+        rows = self._gather(south, west, north, east)
+        lats, lons = self._lats[rows], self._lons[rows]
+        west, east = _wrap_lon(np.array([west, east]))
+        in_lon = (
+            (lons >= west) & (lons <= east)
+            if west <= east
+            else (lons >= west) | (lons <= east)
+        )
+        in_box = (lats >= south) & (lats <= north) & in_lon
+        return np.sort(self._order[rows[in_box]])
+
+    def _gather(self, south: float, west: float, north: float, east: float):
+        south, north = max(south, -90.0), min(north, 90.0)
+        if south > north:
+            return np.array([], dtype=np.int64)
+
+        lat_bins = range(self._lat_bin(south), self._lat_bin(north) + 1)
+        if east - west >= 360:
+            lon_ranges = [(0, self._n_lon - 1)]
+        else:
+            west_bin, east_bin = self._lon_bin(_wrap_lon(np.array([west, east])))
+            lon_ranges = (
+                [(west_bin, east_bin)]
+                if west_bin <= east_bin
+                else [(west_bin, self._n_lon - 1), (0, east_bin)]
+            )
+
+        slices = [
+            np.arange(
+                self._offsets[lat_bin * self._n_lon + start],
+                self._offsets[lat_bin * self._n_lon + end + 1],
+            )
+            for lat_bin in lat_bins
+            for start, end in lon_ranges
+        ]
+        return np.concatenate(slices) if slices else np.array([], dtype=np.int64)
+
+    def _lat_bin(self, lat):
+        return np.clip(
+            np.floor((np.asarray(lat) + 90) / self.cell_deg), 0, self._n_lat - 1
+        ).astype(np.int64)
+
+    def _lon_bin(self, lon):
+        return np.clip(
+            np.floor((np.asarray(lon) + 180) / self.cell_deg), 0, self._n_lon - 1
+        ).astype(np.int64)
+
+
+def _wrap_lon(lon: np.ndarray) -> np.ndarray:
+    wrapped = (lon + 180) % 360 - 180
+    # keep 180 itself rather than folding it onto -180
+    return np.where((lon == 180), 180.0, wrapped)
+
+
+def to_xyz(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat_rad, lon_rad = np.radians(lats), np.radians(lons)
+    return np.column_stack(
+        (
+            np.cos(lat_rad) * np.cos(lon_rad),
+            np.cos(lat_rad) * np.sin(lon_rad),
+            np.sin(lat_rad),
+        )
+    )
@@ -0,0 +1,92 @@
+from collections import Counter
+from dataclasses import dataclass
+import re
+
+import numpy as np
+
+# completions precomputed per prefix, and so the most a lookup can return
+MAX_SUGGESTIONS = 10
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    count: int
+
+
+class PrefixIndex:
+    """
+    Prefix trie over suggestion terms, stored flat: the prefix of every node
+    in one sorted byte-string array and each node's precomputed top-k
+    completions as a row of term ids.
+
+    Terms are reachable from the start of any of their words, so "reno"
+    completes to "El Reno, OK". Prefixes longer than `max_depth` fall back to
+    filtering the deepest node's completions.
+    """
+
+    def __init__(
+        self, term_counts: Counter, k: int = MAX_SUGGESTIONS, max_depth: int = 24
+    ):
+        self.k = k
+        self.max_depth = max_depth
+
+        ranked = sorted(term_counts.items(), key=lambda tc: (-tc[1], len(tc[0]), tc[0]))
+        self._completions = [
+            Completion(text=text, count=count) for text, count in ranked
+        ]
+
+        nodes: dict[bytes, list[int]] = {}
+        for term_id, completion in enumerate(self._completions):
+            for key in _word_suffixes(normalize_prefix(completion.text)):
+                for depth in range(1, min(len(key), max_depth) + 1):
+                    node = nodes.setdefault(key[:depth].encode(), [])
+                    if len(node) < k and term_id not in node:
+                        node.append(term_id)
+
+        prefixes = sorted(nodes)
+        self._prefixes = np.array(prefixes, dtype=bytes)
+        self._top = np.full((len(prefixes), k), -1, dtype=np.int32)
+        for row, prefix in enumerate(prefixes):
+            self._top[row, : len(nodes[prefix])] = nodes[prefix]
+
+    def __len__(self):
+        return len(self._prefixes)
+
+    def complete(self, prefix: str, limit: int | None = None) -> list[Completion]:
+        prefix = normalize_prefix(prefix)
+        limit = self.k if limit is None else min(limit, self.k)
+        if not prefix:
+            return []
+
+        completions = self._node(prefix[: self.max_depth].encode())
+        if len(prefix) > self.max_depth:
+            completions = [
+                c
+                for c in completions
+                if any(
+                    key.startswith(prefix)
+                    for key in _word_suffixes(normalize_prefix(c.text))
+                )
+            ]
+        return completions[:limit]
+
+    def _node(self, key: bytes) -> list[Completion]:
+        # longer keys would be truncated to the array's width when compared
+        if len(key) > self._prefixes.itemsize:
+            return []
+
+        row = np.searchsorted(self._prefixes, key)
+        if row == len(self._prefixes) or self._prefixes[row] != key:
+            return []
+        return [
+            self._completions[term_id] for term_id in self._top[row] if term_id >= 0
+        ]
+
+
+def normalize_prefix(prefix: str) -> str:
+    return re.sub(r"\s+", " ", prefix.strip().lower())
+
+
+def _word_suffixes(key: str) -> list[str]:
+    return [key[m.start() :] for m in re.finditer(r"\b\w", key)]
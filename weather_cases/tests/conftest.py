@@ -0,0 +1,16 @@
+import pytest
+
+from weather_cases.io import read_all_cases
+from weather_cases.registry import WeatherCaseRegistry
+
+
+@pytest.fixture(scope="session")
+def cases_df():
+    return read_all_cases(with_id=False)
+
+
+@pytest.fixture(scope="session")
+def registry(cases_df):
+    registry = WeatherCaseRegistry()
+    registry.items = cases_df
+    return registry
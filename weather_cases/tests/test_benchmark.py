@@ -0,0 +1,12 @@
+from weather_cases.benchmark import synthetic_archive
+from weather_cases.extract import to_hash
+
+
+def test_synthetic_archive(cases_df):
+    df = synthetic_archive(cases_df, 3)
+
+    assert len(df) == 3 * len(cases_df)
+    assert list(df.columns) == list(cases_df.columns)
+    assert df.time_start.is_monotonic_decreasing
+    ids = {to_hash(row) for _, row in df.iterrows()}
+    assert len(ids) > 2.9 * len({to_hash(row) for _, row in cases_df.iterrows()})
@@ -0,0 +1,29 @@
+import pytest
+
+from weather_cases.utils.cache import LRUCache
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = LRUCache(maxsize=10, maxbytes=10, sizeof=len)
+    cache.put("a", b"xxxx")
+    cache.put("b", b"xxxx")
+    cache.get("a")
+    cache.put("c", b"xxxx")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"xxxx"
+    assert cache.bytes == 8
+
+    cache.put("a", b"x")
+    assert cache.bytes == 5
+    cache.put("d", b"x" * 11)
+    assert cache.get("d") is None
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.size) == (2, 2, 2)
+    assert info.hit_rate == 0.5
+
+
+def test_byte_budget_needs_sizeof():
+    with pytest.raises(ValueError):
+        LRUCache(maxbytes=10)
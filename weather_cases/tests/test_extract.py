@@ -0,0 +1,27 @@
+import pandas as pd
+
+from weather_cases.extract import (
+    LIST_COLUMNS,
+    _to_list,
+    date_attrs,
+    derive_columns,
+    location_attrs,
+    to_hash,
+)
+
+
+def test_derive_columns_matches_row_attrs(cases_df):
+    derived = derive_columns(cases_df)
+    assert derived.index.equals(cases_df.index)
+
+    for (_, row), values in zip(cases_df.iterrows(), derived.itertuples(index=False)):
+        assert values.id == to_hash(row)
+        assert values.locations == location_attrs(row)["locations"]
+        assert values.states == location_attrs(row)["states"]
+        assert values.date_reprs == date_attrs(row)["date_reprs"]
+        for col in LIST_COLUMNS:
+            assert getattr(values, col) == _to_list(row, col)
+
+
+def test_derive_columns_empty():
+    assert derive_columns(pd.DataFrame()).empty
@@ -0,0 +1,50 @@
+import gzip
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from weather_cases import io
+from weather_cases.io import archive_files, parse_file, read_file, sidecar_path
+
+
+@pytest.fixture
+def archive(tmp_path):
+    source = archive_files()[0]
+    file = tmp_path / os.path.basename(source)
+    shutil.copy(source, file)
+    return str(file)
+
+
+def _no_parsing(*args, **kwargs):
+    raise AssertionError("CSV parsed")
+
+
+def test_parse_file_is_typed(archive):
+    df = parse_file(archive)
+    assert df["lat"].dtype == "float64"
+    assert df["time_start"].dtype == "datetime64[ns]"
+
+
+def test_read_file_uses_sidecar(archive, monkeypatch):
+    expected = read_file(archive, with_id=True)
+    assert os.path.exists(sidecar_path(archive))
+
+    monkeypatch.setattr(io, "parse_file", _no_parsing)
+    pd.testing.assert_frame_equal(read_file(archive, with_id=True), expected)
+
+    # touched but unchanged: found by hash
+    os.utime(archive, ns=(0, 0))
+    pd.testing.assert_frame_equal(read_file(archive, with_id=True), expected)
+
+
+def test_read_file_reparses_changed_file(archive):
+    read_file(archive, with_id=False)
+    # the header, the units row and ten cases
+    with gzip.open(archive, "rt") as f:
+        lines = f.readlines()[:12]
+    with gzip.open(archive, "wt") as f:
+        f.writelines(lines)
+
+    assert len(read_file(archive, with_id=False, filter_incomplete=False)) == 10
@@ -0,0 +1,28 @@
+from weather_cases.utils.metrics import MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsRegistry()
+    histogram = metrics.histogram("latency", "Latency.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value, stage="load")
+
+    lines = metrics.render().splitlines()
+    assert 'latency_bucket{stage="load",le="0.1"} 2' in lines
+    assert 'latency_bucket{stage="load",le="1"} 3' in lines
+    assert 'latency_bucket{stage="load",le="+Inf"} 4' in lines
+    assert 'latency_count{stage="load"} 4' in lines
+    assert 'latency_sum{stage="load"} 2.65' in lines
+
+
+def test_counter():
+    metrics = MetricsRegistry()
+    counter = metrics.counter("reads_total", "Reads.", ("outcome",))
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome="ok")
+    counter.inc(outcome='not "found"')
+
+    lines = metrics.render().splitlines()
+    assert lines[:2] == ["# HELP reads_total Reads.", "# TYPE reads_total counter"]
+    assert 'reads_total{outcome="ok"} 3' in lines
+    assert 'reads_total{outcome="not \\"found\\""} 1' in lines
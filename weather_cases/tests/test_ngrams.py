@@ -0,0 +1,33 @@
+from rapidfuzz import fuzz
+
+from weather_cases.ngrams import NgramIndex, ngrams
+
+DOCS = [
+    "locations moore ok moore ok states ok oklahoma tags tornado wedge outbreak none",
+    "locations el reno ok el reno ok states ok oklahoma tags tornado outbreak none",
+    "locations joplin mo joplin mo states mo missouri tags tornado outbreak none",
+    "short doc",
+]
+
+
+def test_ngrams():
+    assert ngrams("abcd", 3) == {"abc", "bcd"}
+    assert ngrams("ab", 3) == set()
+
+
+def test_candidates_narrow_to_substring_matches():
+    index = NgramIndex(DOCS)
+    assert list(index.candidates("el reno", 60)) == [1, 3]
+
+
+def test_candidates_include_every_match():
+    index = NgramIndex(DOCS)
+    for q in ["moore", "joplln", "oklahoma", "tornado", "mo", "el ren", "reno el"]:
+        for min_score in [50, 58, 60, 80]:
+            candidates = set(index.candidates(q, min_score))
+            matches = {
+                idx
+                for idx, doc in enumerate(DOCS)
+                if fuzz.WRatio(q, doc) >= min_score
+            }
+            assert matches <= candidates
@@ -0,0 +1,192 @@
+from collections import Counter
+from datetime import date
+
+from pydantic import TypeAdapter
+import pytest
+from rapidfuzz import fuzz, process
+
+from weather_cases.extract import normalize_query, to_hash, to_weather_case
+from weather_cases.filters import CaseFilters
+from weather_cases.models import WeatherCase
+from weather_cases.pagination import Cursor
+from weather_cases.registry import WeatherCaseRegistry, ranked, top_k
+
+
+def _ids(results):
+    return [(case.weather_case.id, score) for case, score in results]
+
+
+def test_search(registry):
+    results = registry.search("el reno")
+    assert results
+    assert all(score >= 60 for _, score in results)
+    assert any("El Reno" in case.weather_case.event_name for case, _ in results)
+
+
+def test_search_many_matches_search(registry):
+    queries = ["moore", "el reno", "tornado", "2013", "x", ""]
+    results = registry.search_many(queries)
+    assert [_ids(r) for r in results] == [_ids(registry.search(q)) for q in queries]
+
+
+def test_search_cache(cases_df):
+    registry = WeatherCaseRegistry(search_cache_size=2)
+    registry.items = cases_df
+
+    first = registry.search("El Reno")
+    assert registry.search("el reno!") is first
+    assert registry.search_cache_info.hits == 1
+    assert registry.search_cache_info.misses == 1
+
+    registry.search("moore")
+    registry.search("joplin")
+    assert registry.search_cache_info.size == 2
+
+    registry.items = cases_df
+    assert registry.search_cache_info.size == 0
+
+
+def test_search_with_filters(registry):
+    filters = CaseFilters(states=("ok",), years=(2013,), tags=("Tornado",))
+    expected = [
+        (case, score)
+        for case, score in registry.search("tornado")
+        if "OK" in case.searchable["states"]
+        and case.weather_case.time_start.year == 2013
+        and "tornado" in case.weather_case.tags
+    ]
+    assert expected
+    assert _ids(registry.search("tornado", filters=filters)) == _ids(expected)
+
+
+def test_search_with_date_range(registry):
+    filters = CaseFilters(start=date(2013, 5, 20), end=date(2013, 5, 20))
+    results = registry.search("ok", min_score=0, filters=filters)
+    assert results
+    assert all(
+        c.weather_case.time_start.date() == date(2013, 5, 20) for c, _ in results
+    )
+
+
+def test_get_by_year(registry, cases_df):
+    expected = cases_df[cases_df["time_start"].dt.year == 2013]
+    cases = registry.get_by_year(2013)
+    assert [c.event_name for c in cases] == list(expected["event_name"])
+    assert registry.get_by_year_json(2013) == TypeAdapter(list[WeatherCase]).dump_json(
+        cases
+    )
+    assert registry.get_by_year(1800) == []
+    assert registry.get_by_year_json(1800) == b"[]"
+
+
+def test_columnar_elements(registry, cases_df):
+    assert registry.dataframe.equals(cases_df)
+
+    row = cases_df.iloc[0]
+    elem = registry.items[to_hash(row)]
+    assert elem.weather_case == to_weather_case(row)
+    assert elem.row_equals(row)
+    assert elem.time_start == row["time_start"]
+    assert not hasattr(elem, "__dict__")
+
+
+def test_similar(registry):
+    case_id, element = next(iter(registry.items.items()))
+    results = registry.similar(case_id, k=5)
+
+    assert len(results) == 5
+    assert all(case is not element for case, _ in results)
+    distances = [distance for _, distance in results]
+    assert distances == sorted(distances)
+
+
+def test_top_k_matches_full_sort(registry):
+    def full_sort(items, limit):
+        return sorted(
+            items, key=lambda item: (item[1], item[0].time_start), reverse=True
+        )[:limit]
+
+    for q in ["tornado", "el reno", "ok", "2013"]:
+        items = registry.search(q)
+        for limit in [0, 1, 5, 50, len(items), len(items) + 1]:
+            assert top_k(items, limit) == full_sort(items, limit)
+
+
+def test_result_set_pages(registry):
+    items = registry.search("tornado")
+
+    results = registry.result_set("Tornado", registry.build_id)
+    assert registry.result_set("tornado!", registry.build_id) is results
+    pages = [results.page(offset, 100) for offset in range(0, len(results), 100)]
+    assert [item for page in pages for item in page] == top_k(items, len(items))
+    assert registry.result_set("tornado", "old build") is None
+
+
+def test_cursor_round_trip():
+    filters = CaseFilters(states=("OK",), years=(2013,), start=date(2013, 5, 1))
+    for cursor in [
+        Cursor(q="el reno", build_id="abc123", offset=40),
+        Cursor(q="tornado", build_id="abc123", offset=5, filters=filters),
+    ]:
+        assert Cursor.decode(cursor.encode()) == cursor
+    for invalid in ["not a cursor", Cursor("q", "abc123", -1).encode()]:
+        with pytest.raises(ValueError):
+            Cursor.decode(invalid)
+
+
+def test_search_corrects_typos(registry):
+    for q, name in [
+        ("hallam nb", "Hallam, NE"),
+        ("halam ne", "Hallam, NE"),
+        ("jopln mo", "Joplin, MO"),
+    ]:
+        assert name in [case.weather_case.event_name for case, _ in registry.search(q)]
+    # "ms" is a state code of its own, so it is not read as a typo of "mo"
+    assert registry.data.typos.resolve("joplin ms") == ("joplin ms", None)
+
+
+def test_search_with_typos_is_in_score_order(registry):
+    for q in ["hallam nb", "jopln mo", "el rneo", "moore ok 2013 torndo"]:
+        corrected, _ = registry.data.typos.resolve(q)
+        assert corrected != q
+        items = registry.search(q)
+        scores = [score for _, score in items]
+        assert scores == sorted(scores, reverse=True)
+        for limit in [1, 5, len(items)]:
+            assert top_k(items, limit) == ranked(items)[:limit]
+
+
+def test_search_without_typos_is_unchanged(registry):
+    elements = registry.data.elements
+    strings = [element.search_string for element in elements]
+    for q in ["zz", "xy", "abc", "qq", "ef", "dixie", "el reno", "tornado", "ok"]:
+        expected = process.extract(
+            normalize_query(q),
+            strings,
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=60,
+            limit=None,
+        )
+        assert sorted(_ids(registry.search(q))) == sorted(
+            _ids((elements[pos], int(round(score))) for _, score, pos in expected)
+        )
+
+
+def test_facets(registry):
+    cases = [element.weather_case for element in registry.data.elements]
+    years = Counter(str(case.time_start.year) for case in cases)
+    outbreaks = Counter(case.outbreak.strip() for case in cases if case.outbreak)
+    facets = registry.facets()
+    assert facets["year"] == dict(years)
+    assert facets["outbreak"] == dict(outbreaks)
+    assert list(facets["year"].values()) == sorted(years.values(), reverse=True)
+
+    filters = CaseFilters(years=(2013,))
+    assert registry.facets(filters=filters)["year"] == {"2013": years["2013"]}
+
+    results = registry.search("tornado", filters=filters)
+    tags = Counter(tag for case, _ in results for tag in set(case.weather_case.tags))
+    facets = registry.facets("tornado", filters=filters)
+    assert facets["tag"] == dict(tags)
+    assert sum(facets["year"].values()) == len(results)
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from weather_cases.io import read_all_cases
+from weather_cases.registry import RegistryData, WeatherCaseRegistry
+from weather_cases.reload import ArchiveReloader
+
+HEADER = (
+    "event_name,time_start,time_end,country,lat,lon,magnitude,tags,features,"
+    "records,nickname,outbreak,notes,user comments,photo/video,account/summary\n"
+    "description row,,,,,,,,,,,,,,,\n"
+)
+ROWS = [
+    '"Moore, OK",20130520_2008,,US,35.33,-97.49,EF5,"tornado, wedge",,,'
+    "Moore,May 2013,,comment,,\n",
+    '"El Reno, OK",20130531_2305,,US,35.5,-98.0,EF3,tornado,,,,,,,,\n',
+]
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("data")
+    path = tmp_path / "data" / "cases.csv"
+    path.write_text(HEADER + "".join(ROWS))
+    return path
+
+
+def test_reload(archive):
+    registry = WeatherCaseRegistry()
+    registry.items = read_all_cases(with_id=False)
+    reloader = ArchiveReloader(registry)
+    reloader.prime()
+    previous = registry.data
+    moore = registry.search("moore")[0][0].weather_case.id
+
+    assert reloader.reload().changed_files == []
+
+    archive.write_text(
+        HEADER
+        + ROWS[0]
+        + ROWS[1].replace("EF3", "EF4")
+        + '"Joplin, MO",20110522_2234,,US,37.06,-94.51,EF5,tornado,,,,,,,,\n'
+    )
+    os.utime(archive, ns=(0, 0))
+
+    result = reloader.reload()
+    assert result.changed_files == [str(archive)]
+    assert (result.added, result.updated, result.removed) == (1, 1, 0)
+    # unchanged rows are carried over rather than re-serialized
+    rebuilt = RegistryData.build(read_all_cases(with_id=False), previous=previous)
+    assert rebuilt.items[moore].search_string is previous.items[moore].search_string
+    assert registry.search("el reno")[0][0].weather_case.magnitude == "EF4"
+    assert registry.search("joplin")
+
+
+def test_follow(archive):
+    registries = [WeatherCaseRegistry(), WeatherCaseRegistry()]
+    reloaders = [ArchiveReloader(registry) for registry in registries]
+    for reloader in reloaders:
+        reloader.load()
+    assert not reloaders[1].follow()
+
+    archive.write_text(
+        HEADER
+        + "".join(ROWS)
+        + '"Joplin, MO",20110522_2234,,US,37.06,-94.51,EF5,tornado,,,,,,,,\n'
+    )
+    os.utime(archive, ns=(0, 0))
+    assert reloaders[0].reload().added == 1
+
+    # the other worker swaps to the snapshot the first one wrote
+    assert not registries[1].search("joplin")
+    assert reloaders[1].follow()
+    assert registries[1].search("joplin")
+    assert not registries[1].data.index._postings.flags.writeable
+    assert reloaders[1].reload().changed_files == []
+    assert not reloaders[1].follow()
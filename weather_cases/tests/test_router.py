@@ -0,0 +1,42 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from weather_cases import router
+
+
+@pytest.fixture
+def client(registry, monkeypatch):
+    monkeypatch.setattr(router, "REGISTRY", registry)
+    app = FastAPI()
+    app.include_router(router.router)
+    return TestClient(app)
+
+
+def test_similar_cases(client, registry):
+    case_id = registry.search("el reno")[0][0].weather_case.id
+
+    response = client.get(f"/cases/{case_id}/similar", params={"k": 3})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+    for k in [0, -1, router.MAX_LIMIT + 1]:
+        response = client.get(f"/cases/{case_id}/similar", params={"k": k})
+        assert response.status_code == 422
+    assert client.get("/cases/missing/similar").status_code == 404
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/cases/near", {"lat": 35.4, "lon": -97.6, "radius_km": 200}),
+        ("/cases/bbox", {"south": 30, "west": -105, "north": 40, "east": -90}),
+    ],
+)
+def test_spatial_limits(client, path, params):
+    response = client.get(path, params={**params, "limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()) <= 2
+
+    for limit in [0, -1, router.MAX_LIMIT + 1]:
+        assert client.get(path, params={**params, "limit": limit}).status_code == 422
@@ -0,0 +1,48 @@
+import numpy as np
+
+from weather_cases.registry import RegistryData, WeatherCaseRegistry
+from weather_cases.snapshot import read_snapshot, write_snapshot
+
+
+def test_snapshot_roundtrip(tmp_path, registry):
+    path = str(tmp_path / "registry.snapshot")
+    write_snapshot(registry.data, "a" * 32, path)
+
+    data = read_snapshot("a" * 32, path)
+    assert isinstance(data, RegistryData)
+    assert list(data.items) == list(registry.items)
+    assert data.search_strings == registry.data.search_strings
+    assert list(data.years_json) == list(registry.data.years_json)
+    assert data.year_slots == registry.data.year_slots
+
+
+def test_snapshot_stale(tmp_path):
+    path = str(tmp_path / "registry.snapshot")
+    assert read_snapshot("a" * 32, path) is None
+
+    write_snapshot(RegistryData.empty(), "a" * 32, path)
+    assert read_snapshot("b" * 32, path) is None
+
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+    assert read_snapshot("a" * 32, path) is None
+
+
+def test_snapshot_arrays_are_mapped(tmp_path, registry):
+    path = str(tmp_path / "registry.snapshot")
+    write_snapshot(registry.data, "a" * 32, path)
+
+    mapped = WeatherCaseRegistry()
+    mapped.data = read_snapshot("a" * 32, path)
+    postings = mapped.data.index._postings
+    assert not postings.flags.writeable
+    base = postings
+    while isinstance(base, np.ndarray):
+        base = base.base
+    assert isinstance(base, memoryview)
+
+    for q in ["el reno", "tornado"]:
+        assert [(case.json, score) for case, score in mapped.search(q)] == [
+            (case.json, score) for case, score in registry.search(q)
+        ]
+    assert mapped.get_by_year_json(2013) == registry.get_by_year_json(2013)
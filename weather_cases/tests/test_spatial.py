@@ -0,0 +1,64 @@
+import numpy as np
+
+from weather_cases.spatial import EARTH_RADIUS_KM, SpatialIndex
+
+
+def _haversine_km(lat, lon, lats, lons):
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = (
+        np.sin((lats - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _points(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lons = rng.uniform(-180, 180, n)
+    return lats, lons
+
+
+def test_within_radius_matches_brute_force():
+    lats, lons = _points()
+    index = SpatialIndex(lats, lons)
+
+    for lat, lon, radius in [
+        (35.5, -97.9, 500),
+        (0, 179.5, 800),
+        (89.5, 10, 300),
+        (-60, -179, 2000),
+        (10, 20, 25000),
+    ]:
+        indices, distances = index.within_radius(lat, lon, radius)
+        expected = _haversine_km(lat, lon, lats, lons)
+
+        assert set(indices) == set(np.flatnonzero(expected <= radius))
+        assert np.all(np.diff(distances) >= 0)
+        assert np.allclose(distances, expected[indices])
+
+
+def test_within_bbox_matches_brute_force():
+    lats, lons = _points()
+    index = SpatialIndex(lats, lons)
+
+    for south, west, north, east in [
+        (30, -105, 40, -90),
+        (-10, 170, 10, -170),
+        (80, -180, 90, 180),
+        (40, 0, 30, 10),
+    ]:
+        in_lon = (
+            (lons >= west) & (lons <= east)
+            if west <= east
+            else (lons >= west) | (lons <= east)
+        )
+        expected = np.flatnonzero((lats >= south) & (lats <= north) & in_lon)
+        assert index.within_bbox(south, west, north, east).tolist() == expected.tolist()
+
+
+def test_registry_near(registry):
+    results = registry.near(35.53, -97.95, 50)
+    assert results
+    assert all(distance <= 50 for _, distance in results)
+    assert any("El Reno" in case.weather_case.event_name for case, _ in results)
@@ -0,0 +1,29 @@
+from collections import Counter
+
+from weather_cases.suggest import PrefixIndex
+
+TERMS = Counter(
+    {"Oklahoma": 20, "OK": 20, "El Reno, OK": 2, "Moore, OK": 3, "Omaha, NE": 1}
+)
+
+
+def test_complete_ranks_by_count():
+    index = PrefixIndex(TERMS)
+    assert [c.text for c in index.complete("om")] == ["Omaha, NE"]
+    assert [c.text for c in index.complete("o", limit=3)] == [
+        "OK",
+        "Oklahoma",
+        "Moore, OK",
+    ]
+
+
+def test_complete_from_word_start():
+    index = PrefixIndex(TERMS)
+    assert [c.text for c in index.complete("reno")] == ["El Reno, OK"]
+    assert [c.text for c in index.complete("OK", limit=2)] == ["OK", "Oklahoma"]
+
+
+def test_complete_past_max_depth():
+    index = PrefixIndex(TERMS, max_depth=2)
+    assert [c.text for c in index.complete("okla")] == ["Oklahoma"]
+    assert index.complete("") == []
@@ -0,0 +1,50 @@
+from datetime import date
+
+import pandas as pd
+
+from weather_cases.filters import CaseFilters
+from weather_cases.timeindex import TimeIndex
+
+TIMES = [
+    pd.Timestamp("2013-05-31 23:00"),
+    pd.Timestamp("2013-05-20 20:00"),
+    pd.Timestamp("2011-05-22 22:30"),
+    pd.Timestamp("2010-12-31 18:00"),
+    pd.Timestamp("2005-01-03 12:00"),
+    pd.Timestamp("2013-05-20 20:00"),
+]
+
+
+def test_between():
+    index = TimeIndex(TIMES)
+    assert index.between(date(2013, 5, 20), date(2013, 5, 31)).tolist() == [0, 1, 5]
+    assert index.between(end=date(2010, 12, 31)).tolist() == [3, 4]
+    assert index.between(start=date(2011, 1, 1)).tolist() == [0, 1, 5, 2]
+    assert index.between().tolist() == [0, 1, 5, 2, 3, 4]
+    assert index.between(date(2014, 1, 1), date(2013, 1, 1)).tolist() == []
+
+
+def test_in_calendar_window():
+    index = TimeIndex(TIMES)
+    assert index.in_calendar_window(date(2000, 5, 20), date(2000, 5, 22)).tolist() == [
+        1,
+        5,
+        2,
+    ]
+    # wraps around the new year
+    assert index.in_calendar_window(date(2000, 12, 1), date(2001, 1, 31)).tolist() == [
+        3,
+        4,
+    ]
+
+
+def test_registry_between_matches_filters(registry):
+    start, end = date(2013, 5, 1), date(2013, 5, 31)
+    mask = registry.data.filters.mask(CaseFilters(start=start, end=end))
+    expected = {registry.data.elements[pos].pos for pos in mask.nonzero()[0]}
+
+    cases = registry.between(start, end)
+    assert {case.pos for case in cases} == expected
+    assert [c.time_start for c in cases] == sorted(
+        (c.time_start for c in cases), reverse=True
+    )
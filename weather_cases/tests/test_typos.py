@@ -0,0 +1,41 @@
+from weather_cases.typos import TypoIndex
+
+CASES = [
+    {"joplin", "mo"},
+    {"hallam", "ne"},
+    {"moore", "ok"},
+    {"el", "reno", "ok"},
+    {"jackson", "ms"},
+]
+KNOWN = {"tornado", "wedge", "2013", "joplin", "mo", "hallam", "ne", "moore", "ok"}
+
+
+def test_corrections():
+    index = TypoIndex(CASES, KNOWN)
+    assert index.corrections("jopln") == [(1, "joplin")]
+    assert index.corrections("rneo") == [(1, "reno")]
+    assert index.corrections("mooer") == [(1, "moore")]
+    assert index.corrections("x") == []
+
+
+def test_resolve():
+    index = TypoIndex(CASES, KNOWN)
+    corrected, cases = index.resolve("jopln  mo")
+    assert corrected == "joplin  mo"
+    assert cases.tolist() == [0]
+
+    assert index.resolve("el rneo")[0] == "el reno"
+    assert index.resolve("mooer ok")[1].tolist() == [2]
+    # correctly spelled queries are left alone, and no lookup matches
+    assert index.resolve("moore ok") == ("moore ok", None)
+    # short tokens are only corrected alongside longer ones
+    corrected, cases = index.resolve("hallam nb")
+    assert corrected == "hallam ne"
+    assert cases.tolist() == [1]
+    for q in ["zz", "xy", "abc", "nb", "ef", "zz nb"]:
+        assert index.resolve(q) == (q, None)
+    # vocabulary words, like state codes, are never corrected
+    assert index.resolve("jopln ms") == ("joplin ms", None)
+    # known words outside the vocabulary are kept, and no lookup matches
+    assert index.resolve("wedge tornado") == ("wedge tornado", None)
+    assert index.resolve("moore tornado")[1] is None
@@ -0,0 +1,76 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+class TimeIndex:
+    """
+    Case start times sorted newest first, with the permutation back to
+    registry positions, plus the same for the (month, day) of each start
+    time so that calendar windows can be looked up across all years.
+
+    Both are answered with binary search over the sorted keys.
+    """
+
+    def __init__(self, times: list):
+        times = pd.DatetimeIndex(np.array(times, dtype="datetime64[ns]"))
+        keys = -times.asi8
+
+        # newest first, ties in registry order
+        self._order = np.lexsort((np.arange(len(keys)), keys))
+        self._keys = keys[self._order]
+        self._rank = np.empty_like(self._order)
+        self._rank[self._order] = np.arange(len(self._order))
+
+        calendar = _calendar_key(times.month, times.day)
+        self._calendar_order = np.argsort(calendar, kind="stable")
+        self._calendar = calendar[self._calendar_order]
+
+    def __len__(self):
+        return len(self._order)
+
+    def between(
+        self, start: date | None = None, end: date | None = None
+    ) -> np.ndarray:
+        """
+        Positions of cases starting between `start` and the end of `end`
+        (both inclusive), newest first.
+        """
+        lo, hi = 0, len(self._keys)
+        if end is not None:
+            end_key = -_to_ns(np.datetime64(end, "D") + np.timedelta64(1, "D"))
+            lo = np.searchsorted(self._keys, end_key, "right")
+        if start is not None:
+            start_key = -_to_ns(np.datetime64(start, "D"))
+            hi = np.searchsorted(self._keys, start_key, "right")
+        return self._order[lo:hi]
+
+    def in_calendar_window(
+        self, start: date | None = None, end: date | None = None
+    ) -> np.ndarray:
+        """
+        Positions of cases whose start falls between the month and day of
+        `start` and `end` in any year, newest first. A window whose start is
+        later in the year than its end wraps around the new year.
+        """
+        lo_key = _calendar_key(start.month, start.day) if start else 0
+        hi_key = _calendar_key(end.month, end.day) if end else _calendar_key(12, 31)
+
+        lo = np.searchsorted(self._calendar, lo_key, "left")
+        hi = np.searchsorted(self._calendar, hi_key, "right")
+        if lo_key <= hi_key:
+            positions = self._calendar_order[lo:hi]
+        else:
+            positions = np.concatenate(
+                (self._calendar_order[lo:], self._calendar_order[:hi])
+            )
+        return positions[np.argsort(self._rank[positions], kind="stable")]
+
+
+def _to_ns(day: np.datetime64) -> int:
+    return day.astype("datetime64[ns]").astype(np.int64)
+
+
+def _calendar_key(month, day):
+    return np.asarray(month, dtype=np.int64) * 100 + np.asarray(day, dtype=np.int64)
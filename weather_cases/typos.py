@@ -0,0 +1,175 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from itertools import combinations
+import re
+import sys
+import zlib
+
+import numpy as np
+from rapidfuzz.distance import OSA
+
+MAX_DISTANCE = 2
+# shorter tokens are too close to too many words (state codes above all) for
+# a correction to mean anything on its own
+MIN_TYPO_LENGTH = 4
+
+
+class TypoIndex:
+    """
+    Symmetric-delete typo dictionary over a vocabulary of normalized words
+    (locations, states, nicknames), with the cases each word appears in.
+
+    Every word is stored under each string obtainable by deleting up to
+    `MAX_DISTANCE` of its characters. The same deletes of a query token are
+    then looked up to find the words within that many edits of it, without
+    comparing it to the whole vocabulary.
+
+    `known_words` are the words of all searchable text. Those are never
+    treated as typos, even if they are outside the vocabulary.
+    """
+
+    def __init__(
+        self, words_per_case: list[Iterable[str]], known_words: Iterable[str]
+    ):
+        postings = defaultdict(set)
+        for idx, words in enumerate(words_per_case):
+            for word in words:
+                if _is_correctable(word):
+                    postings[sys.intern(word)].add(idx)
+
+        words = sorted(postings)
+        self._words = np.array(words, dtype=object)
+        self._word_ids = {word: word_id for word_id, word in enumerate(words)}
+        self._offsets = np.cumsum([0] + [len(postings[w]) for w in words])
+        self._postings = np.array(
+            [idx for word in words for idx in sorted(postings[word])], dtype=np.int32
+        )
+
+        # deletes are stored by checksum; collisions only add candidates, which
+        # are checked against the real edit distance anyway
+        pairs = sorted(
+            {
+                (_checksum(delete), word_id)
+                for word_id, word in enumerate(words)
+                for delete in _deletes(word, _max_distance(word))
+            }
+        )
+        self._deletes = np.array([delete for delete, _ in pairs], dtype=np.uint32)
+        self._delete_words = np.array([word_id for _, word_id in pairs], dtype=np.int32)
+        self._known = np.unique(
+            np.array([_checksum(word) for word in set(known_words)], dtype=np.uint32)
+        )
+
+    def __len__(self):
+        return len(self._words)
+
+    def cases(self, word: str) -> np.ndarray:
+        """Indices (ascending) of the cases containing `word`."""
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            return self._postings[:0]
+        return self._postings[self._offsets[word_id] : self._offsets[word_id + 1]]
+
+    def corrections(self, token: str) -> list[tuple[int, str]]:
+        """
+        Vocabulary words within the edit distance allowed for `token`, as
+        (distance, word) pairs, closest and then most common first.
+        """
+        max_distance = _max_distance(token)
+        if max_distance == 0 or not _is_correctable(token):
+            return []
+
+        keys = np.array(
+            [_checksum(delete) for delete in _deletes(token, max_distance)],
+            dtype=np.uint32,
+        )
+        los = np.searchsorted(self._deletes, keys, side="left")
+        his = np.searchsorted(self._deletes, keys, side="right")
+        word_ids = {
+            word_id
+            for lo, hi in zip(los, his)
+            for word_id in self._delete_words[lo:hi].tolist()
+        }
+
+        candidates = []
+        for word_id in word_ids:
+            word = self._words[word_id]
+            distance = OSA.distance(token, word, score_cutoff=max_distance)
+            if distance <= max_distance:
+                count = self._offsets[word_id + 1] - self._offsets[word_id]
+                candidates.append((distance, -count, word))
+        return [(distance, word) for distance, _, word in sorted(candidates)]
+
+    def resolve(self, q: str) -> tuple[str, np.ndarray | None]:
+        """
+        Rewrite the misspelled tokens of the normalized query `q` to their
+        closest vocabulary word. Returns the rewritten query, and, when some
+        token was corrected and every token is then a vocabulary word, the
+        indices of the cases containing all of them. A query with nothing to
+        correct comes back unchanged, without cases.
+
+        Vocabulary words, state codes included, and other known words
+        ("tornado", "2013") are never corrected. Tokens are resolved longest
+        first, each to the first correction that some case contains together
+        with the tokens resolved so far. Tokens shorter than `MIN_TYPO_LENGTH`
+        are only corrected alongside such longer tokens, like the state in
+        "hallam nb", never on their own.
+        """
+        tokens = set(q.split())
+        cases = None
+        replacements = {}
+        for token in sorted(tokens, key=lambda token: (-len(token), token)):
+            if token in self._word_ids:
+                options = [token]
+            elif self._is_known(token):
+                continue
+            elif len(token) >= MIN_TYPO_LENGTH or cases is not None:
+                options = [word for _, word in self.corrections(token)]
+            else:
+                continue
+            for option in options:
+                option_cases = self.cases(option)
+                if cases is not None:
+                    option_cases = np.intersect1d(
+                        cases, option_cases, assume_unique=True
+                    )
+                if len(option_cases):
+                    replacements[token] = option
+                    cases = option_cases
+                    break
+
+        if all(token == word for token, word in replacements.items()):
+            return q, None
+        # substitute in place, keeping the query's own spacing
+        corrected = re.sub(r"\S+", lambda m: replacements.get(m[0], m[0]), q)
+        if len(replacements) < len(tokens):
+            return corrected, None
+        return corrected, cases
+
+    def _is_known(self, word: str) -> bool:
+        # checksums again: a collision only means a typo is left uncorrected
+        key = _checksum(word)
+        pos = np.searchsorted(self._known, key)
+        return pos < len(self._known) and self._known[pos] == key
+
+
+def _max_distance(token: str) -> int:
+    if len(token) < 2:
+        return 0
+    return 1 if len(token) <= 7 else MAX_DISTANCE
+
+
+def _is_correctable(word: str) -> bool:
+    return word.isalpha()
+
+
+def _checksum(s: str) -> int:
+    return zlib.crc32(s.encode())
+
+
+def _deletes(word: str, max_distance: int) -> set[str]:
+    deletes = {word}
+    for n in range(1, min(max_distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), n):
+            deletes.add("".join(c for i, c in enumerate(word) if i not in positions))
+    return deletes
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import Any
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+    bytes: int = 0
+    maxbytes: int | None = None
+    hit_rate: float = 0.0
+
+
+class LRUCache:
+    """
+    Thread-safe bounded mapping that evicts the least recently used entry.
+    With a `ttl` (in seconds), entries also expire that long after being put.
+    With a `maxbytes` budget, entries are also evicted while their total size,
+    as measured by `sizeof` when they are put, is over it.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float | None = None,
+        maxbytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ):
+        if maxbytes is not None and sizeof is None:
+            raise ValueError("maxbytes needs a sizeof function")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._data: OrderedDict[Hashable, tuple] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                expires, value, _ = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        nbytes = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.maxbytes is not None and nbytes > self.maxbytes:
+                # would evict everything else and still not fit
+                return
+            self._data[key] = (expires, value, nbytes)
+            self.bytes += nbytes
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.bytes > self.maxbytes
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def info(self) -> CacheInfo:
+        lookups = self.hits + self.misses
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self._data),
+            maxsize=self.maxsize,
+            bytes=self.bytes,
+            maxbytes=self.maxbytes,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+        )
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, nbytes = self._data.pop(key)
+        self.bytes -= nbytes
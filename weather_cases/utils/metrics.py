@@ -0,0 +1,238 @@
+"""
+In-process metrics exposed in the Prometheus text format: counters,
+fixed-bucket histograms and timing spans.
+
+Each metric keeps its samples in a dict keyed by label values behind a lock,
+so recording one costs a dict lookup and, for histograms, a bisect.
+"""
+
+import bisect
+from collections.abc import Callable
+from contextlib import contextmanager
+from threading import Lock
+import time
+
+# request and stage latencies, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_label_values(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # per label values: count in each bucket (not cumulative), plus +Inf,
+        # then the running sum
+        self._values: dict[tuple, list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_values(self.labelnames, labels)
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[bucket] += 1
+            counts[-1] += value
+
+    def count(self, **labels: str) -> int:
+        counts = self._values.get(_label_values(self.labelnames, labels))
+        return sum(counts[:-1]) if counts else 0
+
+    @contextmanager
+    def time(self, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format(bound)}
+                yield self.name + "_bucket", bucket_labels, cumulative
+            yield self.name + "_count", labels, cumulative
+            yield self.name + "_sum", labels, counts[-1]
+
+
+class CallbackMetric:
+    """
+    A metric whose samples are read from elsewhere when rendered, for values
+    that are already counted, such as cache statistics.
+    """
+
+    def __init__(
+        self, name: str, help: str, type: str, callback: Callable[[], float]
+    ):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.callback = callback
+
+    def samples(self):
+        yield self.name, {}, self.callback()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | CallbackMetric] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), **kwargs
+    ):
+        return self.register(Histogram(name, help, labelnames, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+REQUEST_LATENCY = METRICS.histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route.",
+    ("method", "route", "status"),
+)
+STAGE_LATENCY = METRICS.histogram(
+    "stage_duration_seconds",
+    "Latency of named processing stages.",
+    ("stage",),
+)
+S3_READS = METRICS.counter(
+    "s3_reads_total", "Datasets opened from S3.", ("kind", "outcome")
+)
+CDN_FETCHES = METRICS.counter(
+    "cdn_fetches_total", "Files fetched from the environment data CDN.", ("outcome",)
+)
+
+
+def span(name: str):
+    """Time a block of code as the stage `name`."""
+    return STAGE_LATENCY.time(stage=name)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request, labelled by
+    its route template rather than its path, so ids don't become labels.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+
+
+def _label_values(labelnames: tuple[str, ...], labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,104 @@
+"""
+A process pool for CPU-bound work called from the event loop, with a bound
+on how many jobs may be queued or running at once.
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from typing import Any
+
+from weather_cases.exceptions import QueueFullException, WorkerUnavailableException
+
+
+class WorkerPool:
+    """
+    Runs jobs in `workers` processes, started and warmed up front by
+    `initializer` so the first requests don't pay for imports. At most
+    `max_pending` jobs are accepted at a time; more raise QueueFullException
+    instead of piling up behind a slow backlog.
+
+    Until started, jobs run in a thread of the current process instead.
+
+    A worker that dies (e.g. killed for running out of memory) breaks the
+    whole executor. The pool then replaces it and retries the job once; if the
+    retry breaks it too, WorkerUnavailableException is raised.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        initializer: Callable[[], None] | None = None,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.initializer = initializer
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._restart_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self._executor is not None or self.workers <= 0:
+            return
+        # spawn rather than fork, the server process has threads running
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self.initializer,
+        )
+        # one job per worker makes the executor start all of them now
+        await asyncio.gather(
+            *(
+                asyncio.wrap_future(self._executor.submit(_ready))
+                for _ in range(self.workers)
+            )
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            raise QueueFullException(f"{self.pending} jobs already pending")
+
+        self.pending += 1
+        try:
+            executor = self._executor
+            try:
+                return await self._submit(executor, func, *args)
+            except BrokenProcessPool:
+                await self._restart(executor)
+            try:
+                return await self._submit(self._executor, func, *args)
+            except BrokenProcessPool:
+                await self._restart(self._executor)
+                raise WorkerUnavailableException("worker processes died twice")
+        finally:
+            self.pending -= 1
+
+    async def _submit(
+        self, executor: ProcessPoolExecutor | None, func: Callable[..., Any], *args
+    ) -> Any:
+        if executor is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.wrap_future(executor.submit(func, *args))
+
+    async def _restart(self, broken: ProcessPoolExecutor | None) -> None:
+        async with self._restart_lock:
+            # jobs failing together restart the executor only once
+            if self._executor is broken:
+                self.shutdown()
+                try:
+                    await self.start()
+                except BrokenProcessPool:
+                    # left broken, so the next job tries again
+                    raise WorkerUnavailableException("worker processes failed to start")
+
+
+def _ready() -> None:
+    pass